@@ -1,16 +1,45 @@
 from fastapi import FastAPI, Query, UploadFile, File
-from fastapi.responses import FileResponse, StreamingResponse
+from fastapi.responses import FileResponse, PlainTextResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 import os
 import json
 import asyncio
+import codecs
+import datetime
+import hashlib
+import threading
+import time
+import uuid
+
+import networkx as nx
 
 # Import your model files
-from app.model_a.orbit_engine import build_graph_from_tles
+from app.api.state_store import get_store
+from app.model_a.catalog import (
+    TLEStreamParser,
+    format_merge_report,
+    merge_catalogs,
+    validate_tle,
+)
+from app.model_a.forecast import (
+    MAX_HORIZON_DAYS,
+    MAX_MEMORY_BUDGET_MB,
+    forecast_conjunctions,
+    pair_timelines,
+)
+from app.model_a.orbit_engine import (
+    build_graph_cloud_vs_targets,
+    build_graph_from_tles,
+    build_graph_one_vs_many,
+    select_tles_by_norad,
+)
+from app.model_b.graph_analytics import ConjunctionAnalytics
 from app.model_b.risk_predictor import heuristic_risk_scores, explain_edge
 from app.model_c.negotiation_planner import run_multi_llm_negotiation
-from app.model_d.report_generator import generate_llm_mission_report
+from app.model_d.report_generator import generate_report_async
+from app.telemetry.metrics import REGISTRY, stage_timer
+from app.telemetry.profiling import profile_run, profiling_enabled
 
 app = FastAPI()
 
@@ -22,11 +51,36 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Global Memory Storage
-LAST_GRAPH = None
-LAST_RISKS = None
-LAST_SATELLITES = None
-LAST_REPORT_PATH = "collision_report.html"
+# Shared state (app/api/state_store.py): analysis snapshots, job status
+# and the monitor set live in the store so every uvicorn worker serves the
+# same view. Each worker only caches decoded copies, keyed by store version.
+COMPUTE_LOCK_TTL_S = float(os.getenv("COMPUTE_LOCK_TTL_S", "900"))
+COMPUTE_POLL_S = 0.5
+# Completed analyses are reused for this long while the catalog files are unchanged
+ANALYZE_FRESHNESS_S = float(os.getenv("ANALYZE_FRESHNESS_S", "300"))
+INFLIGHT = {}   # analysis key -> SharedRun, this worker's running pipelines
+ANALYZE_REQUESTS = REGISTRY.counter(
+    "analyze_requests_total", "Analyze requests by how they were served (run, coalesced, fresh)"
+)
+_SNAPSHOT = (None, 0, None)   # (store, version of "snapshot:latest", Snapshot)
+_MONITOR = (None, 0, 0, 0, None)  # (store, version of "monitor", daemon run, last tick, ConjunctionAnalytics)
+# Handlers decode snapshots and apply monitor diffs in worker threads
+_SNAPSHOT_LOCK = threading.Lock()
+_MONITOR_LOCK = threading.RLock()
+# Retention: the newest SNAPSHOTS_KEPT analyses keep their snapshot/summary/report
+# records, and upload-job status records expire after JOB_RETENTION_S
+SNAPSHOTS_KEPT = int(os.getenv("SNAPSHOTS_KEPT", "20"))
+JOB_RETENTION_S = float(os.getenv("JOB_RETENTION_S", str(24 * 3600)))
+
+# Uploaded catalogs live in DATA_DIR/uploads/<catalog_id>.tle
+UPLOAD_SUBDIR = "uploads"
+UPLOAD_CHUNK_BYTES = 64 * 1024
+UPLOAD_MAX_BYTES = int(float(os.getenv("UPLOAD_MAX_MB", "50")) * 2 ** 20)
+UPLOAD_NEGOTIATE_TOP = 20   # LLM negotiation only for the riskiest pairs
+BACKGROUND_TASKS = set()
+
+# Rolling-horizon monitor diffs kept for /api/monitor?since_tick=
+MONITOR_DIFFS_KEPT = 100
 
 BASE_DIR = os.path.dirname(os.path.dirname(__file__))
 DATA_DIR = os.path.join(BASE_DIR, "data")
@@ -39,10 +93,15 @@ TLE_SOURCES = {
 }
 
 def load_local_tles(filename):
+    tles, _ = load_local_catalog(filename)
+    return tles
+
+def load_local_catalog(filename):
+    """Parse a TLE file and merge it by NORAD ID. Returns (tles, merge_report)."""
     path = os.path.join(DATA_DIR, filename)
     if not os.path.exists(path):
         print("TLE file not found:", path)
-        return []
+        return merge_catalogs({})
 
     tles = []
     with open(path, "r", encoding="utf-8") as f:
@@ -56,15 +115,202 @@ def load_local_tles(filename):
         tles.append((name, l1, l2))
         i += 3
 
-    return tles
+    return merge_catalogs({filename: tles})
+
+# ============================================================
+# SHARED SNAPSHOTS
+# ============================================================
+def encode_graph(G: nx.Graph) -> dict:
+    return {
+        "nodes": [[n, d] for n, d in G.nodes(data=True)],
+        "edges": [[u, v, d] for u, v, d in G.edges(data=True)],
+    }
+
+def decode_graph(data: dict) -> nx.Graph:
+    G = nx.Graph()
+    G.add_nodes_from((n, d) for n, d in data["nodes"])
+    G.add_edges_from((u, v, d) for u, v, d in data["edges"])
+    return G
+
+
+class Snapshot:
+    """One published analysis: graph, risk rows and (lazily) its graph analytics."""
+
+    def __init__(self, key: str, graph: nx.Graph, risks: list, window_hours: float,
+                 analytics: ConjunctionAnalytics = None):
+        self.key = key
+        self.graph = graph
+        self.risks = risks
+        self.window_hours = window_hours
+        self._analytics = analytics
+
+    @property
+    def satellites(self):
+        return list(self.graph.nodes())
+
+    @property
+    def analytics(self) -> ConjunctionAnalytics:
+        if self._analytics is None:
+            self._analytics = ConjunctionAnalytics.from_graph(self.graph, self.window_hours)
+        return self._analytics
+
+
+def make_latest(store, key: str) -> int:
+    """
+    Point "snapshot:latest" at `key` and drop the records of analyses
+    beyond the newest SNAPSHOTS_KEPT (blocking; run it in a thread).
+    """
+    evicted = []
+
+    def touch(keys):
+        keys = [k for k in keys if k != key] + [key]
+        evicted[:] = keys[:-SNAPSHOTS_KEPT]
+        return keys[-SNAPSHOTS_KEPT:]
+
+    store.update("snapshot:index", touch, default=[])
+    version = store.put("snapshot:latest", key)
+    for old in evicted:
+        for prefix in ("snapshot", "summary", "report"):
+            store.delete(f"{prefix}:{old}")
+    return version
+
+def publish_snapshot(snapshot: Snapshot, report_path: str = None):
+    """Store `snapshot` as the latest analysis (blocking; run it in a thread)."""
+    global _SNAPSHOT
+    store = get_store()
+    store.put(f"snapshot:{snapshot.key}", {
+        "graph": encode_graph(snapshot.graph),
+        "risks": snapshot.risks,
+        "window_hours": snapshot.window_hours,
+    })
+    store.put(f"report:{snapshot.key}", report_path)
+    version = make_latest(store, snapshot.key)
+    with _SNAPSHOT_LOCK:
+        _SNAPSHOT = (store, version, snapshot)
+
+def current_snapshot():
+    """Latest analysis published by any worker, or None (blocking; run it in a thread)."""
+    global _SNAPSHOT
+    store = get_store()
+    with _SNAPSHOT_LOCK:
+        version = store.version("snapshot:latest")
+        if version == 0:
+            return None
+        cached_store, cached_version, snapshot = _SNAPSHOT
+        if cached_store is not store or cached_version != version:
+            key = store.get("snapshot:latest")
+            data = store.get(f"snapshot:{key}")
+            if data is None:
+                return None
+            snapshot = Snapshot(key, decode_graph(data["graph"]), data["risks"], data["window_hours"])
+            _SNAPSHOT = (store, version, snapshot)
+        return snapshot
+
+def catalog_version(*filenames) -> str:
+    """Fingerprint of the catalog files (path, mtime, size); changes when one is rewritten."""
+    parts = []
+    for filename in filenames:
+        if filename is None:
+            continue
+        try:
+            st = os.stat(os.path.join(DATA_DIR, filename))
+            parts.append(f"{filename}:{st.st_mtime_ns}:{st.st_size}")
+        except OSError:
+            parts.append(f"{filename}:missing")
+    return hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()[:16]
+
+def analysis_key(source, sample_minutes, primary_source, primary_ids, cloud_source) -> str:
+    version = catalog_version(*(TLE_SOURCES.get(s) for s in (source, primary_source, cloud_source) if s))
+    return "analyze:" + json.dumps([source, sample_minutes, primary_source, primary_ids, cloud_source, version])
+
+def fresh_result(key: str):
+    """
+    Stored result of `key` if it completed within ANALYZE_FRESHNESS_S, else
+    None (blocking; run it in a thread).
+    """
+    store = get_store()
+    record = store.get(f"summary:{key}")
+    if record is None or time.time() - record["completed_at"] > ANALYZE_FRESHNESS_S:
+        return None
+    if store.version(f"snapshot:{key}") == 0:
+        return None
+    return record
+
+async def replay_result(key: str, record: dict):
+    """SSE events for a reused result; it also becomes the current snapshot again."""
+    store = get_store()
+    if await asyncio.to_thread(store.get, "snapshot:latest") != key:
+        await asyncio.to_thread(make_latest, store, key)
+    age = time.time() - record["completed_at"]
+    yield f"data: {json.dumps({'log': f'♻️ Reusing the analysis completed {age:.0f}s ago (catalog unchanged)', 'stage': 'reused'})}\n\n"
+    yield f"data: {json.dumps(record['summary'])}\n\n"
+
+
+class SharedRun:
+    """
+    One running pipeline whose SSE events are fanned out to every
+    subscriber. Late subscribers first get the events already sent. The
+    run continues when all clients disconnect, so its result is stored.
+    """
+
+    def __init__(self, events):
+        self.events = []
+        self.done = False
+        self._changed = asyncio.Condition()
+        self.task = asyncio.create_task(self._pump(events))
+
+    async def _pump(self, events):
+        try:
+            async for event in events:
+                async with self._changed:
+                    self.events.append(event)
+                    self._changed.notify_all()
+        finally:
+            async with self._changed:
+                self.done = True
+                self._changed.notify_all()
+
+    async def subscribe(self):
+        sent = 0
+        while True:
+            async with self._changed:
+                await self._changed.wait_for(lambda: sent < len(self.events) or self.done)
+                batch, done = self.events[sent:], self.done
+            for event in batch:
+                yield event
+            sent += len(batch)
+            if done and sent == len(self.events):
+                return
+
+def forget_run(key: str, run: SharedRun):
+    """Drop a finished run from INFLIGHT unless a newer run already took its key."""
+    if INFLIGHT.get(key) is run:
+        del INFLIGHT[key]
+
+async def wait_for_other_worker(key: str):
+    """Yield SSE events while another worker computes `key`, then its summary."""
+    yield f"data: {json.dumps({'log': '⏳ Another worker is already running this analysis, waiting for its result...', 'stage': 'waiting'})}\n\n"
+    store = get_store()
+    while await asyncio.to_thread(store.locked, f"compute:{key}"):
+        await asyncio.sleep(COMPUTE_POLL_S)
+    record = await asyncio.to_thread(store.get, f"summary:{key}")
+    if record is None:
+        yield f"data: {json.dumps({'error': 'The analysis failed on another worker', 'stage': 'error'})}\n\n"
+        return
+    yield f"data: {json.dumps(record['summary'])}\n\n"
 
 # ============================================================
 # STREAMING GENERATOR FUNCTION
 # ============================================================
-async def pipeline_generator(source: str, sample_minutes: int):
+async def pipeline_generator(source: str, sample_minutes: int,
+                             primary_source: str = None, primary_ids: str = None,
+                             run_id: str = None, cloud_source: str = None):
     """Generator that yields Server-Sent Events for live updates"""
     
-    global LAST_GRAPH, LAST_RISKS, LAST_SATELLITES
+    stage_timings = {}
+    store = get_store()
+    key = analysis_key(source, sample_minutes, primary_source, primary_ids, cloud_source)
+    lock_owner = None
 
     try:
         # Validate source
@@ -72,32 +318,91 @@ async def pipeline_generator(source: str, sample_minutes: int):
             yield f"data: {json.dumps({'error': 'Invalid TLE dataset source'})}\n\n"
             return
 
-        yield f"data: {json.dumps({'log': '🚀 Starting pipeline...', 'stage': 'init'})}\n\n"
+        # Only one worker computes a given catalog + parameters combination
+        if not await asyncio.to_thread(store.acquire, f"compute:{key}", f"{os.getpid()}:{run_id}", COMPUTE_LOCK_TTL_S):
+            async for event in wait_for_other_worker(key):
+                yield event
+            return
+        lock_owner = f"{os.getpid()}:{run_id}"
+        record = await asyncio.to_thread(fresh_result, key)
+        if record is not None:
+            # Another worker finished it while this request was on its way
+            async for event in replay_result(key, record):
+                yield event
+            return
+        await asyncio.to_thread(store.delete, f"summary:{key}")
+
+        yield f"data: {json.dumps({'log': '🚀 Starting pipeline...', 'stage': 'init', 'run_id': run_id, 'pid': os.getpid()})}\n\n"
         await asyncio.sleep(0.1)
 
         # Load TLEs
         yield f"data: {json.dumps({'log': f'📡 Loading TLE data from {source}...', 'stage': 'loading'})}\n\n"
         await asyncio.sleep(0.2)
         
-        tles = load_local_tles(TLE_SOURCES[source])
+        with stage_timer("load", stage_timings):
+            tles, catalog_report = load_local_catalog(TLE_SOURCES[source])
         if not tles:
             yield f"data: {json.dumps({'error': 'TLE dataset is empty'})}\n\n"
             return
-
-        tles = tles[:40]  # limit for speed
-        yield f"data: {json.dumps({'log': f'✅ Loaded {len(tles)} satellites', 'stage': 'loaded'})}\n\n"
+        if catalog_report["duplicates"] or catalog_report["rejects"]:
+            yield f"data: {json.dumps({'log': f'  Catalog: {format_merge_report(catalog_report)}', 'stage': 'loading', 'rejects': catalog_report['rejects'][:20]})}\n\n"
+
+        # Fleet screening: primaries vs the full secondary catalog
+        primaries = None
+        cloud = None
+        if cloud_source:
+            # Debris-cloud screening: the full cloud vs the `source` targets
+            if cloud_source not in TLE_SOURCES:
+                yield f"data: {json.dumps({'error': 'Invalid cloud TLE dataset source'})}\n\n"
+                return
+            cloud = load_local_tles(TLE_SOURCES[cloud_source])
+            tles = tles[:40]  # limit for speed
+            yield f"data: {json.dumps({'log': f'✅ Loaded {len(cloud)} cloud fragments vs {len(tles)} targets', 'stage': 'loaded'})}\n\n"
+        elif primary_source or primary_ids:
+            if primary_source and primary_source not in TLE_SOURCES:
+                yield f"data: {json.dumps({'error': 'Invalid primary TLE dataset source'})}\n\n"
+                return
+            primaries = load_local_tles(TLE_SOURCES[primary_source]) if primary_source else tles
+            if primary_ids:
+                primaries = select_tles_by_norad(primaries, primary_ids.split(","))
+            if not primaries:
+                yield f"data: {json.dumps({'error': 'No primary satellites matched'})}\n\n"
+                return
+            primaries = primaries[:40]  # limit for speed
+            yield f"data: {json.dumps({'log': f'✅ Loaded {len(primaries)} primaries vs {len(tles)} catalog objects', 'stage': 'loaded'})}\n\n"
+        else:
+            tles = tles[:40]  # limit for speed
+            yield f"data: {json.dumps({'log': f'✅ Loaded {len(tles)} satellites', 'stage': 'loaded'})}\n\n"
         await asyncio.sleep(0.2)
 
         # MODEL A: Orbit Propagation
         yield f"data: {json.dumps({'log': '🛰️ MODEL A: Starting orbit propagation (SGP4)...', 'stage': 'model_a'})}\n\n"
         await asyncio.sleep(0.3)
         
-        G = build_graph_from_tles(
-            tles,
-            sample_minutes=sample_minutes,
-            step_min=10,
-            close_threshold_km=20,
-        )
+        with stage_timer("model_a", stage_timings):
+            if cloud is not None:
+                G = build_graph_cloud_vs_targets(
+                    cloud,
+                    tles,
+                    sample_minutes=sample_minutes,
+                    step_min=10,
+                    close_threshold_km=20,
+                )
+            elif primaries is not None:
+                G = build_graph_one_vs_many(
+                    primaries,
+                    tles,
+                    sample_minutes=sample_minutes,
+                    step_min=10,
+                    close_threshold_km=20,
+                )
+            else:
+                G = build_graph_from_tles(
+                    tles,
+                    sample_minutes=sample_minutes,
+                    step_min=10,
+                    close_threshold_km=20,
+                )
         
         yield f"data: {json.dumps({'log': f'✅ MODEL A: Propagated {G.number_of_nodes()} nodes, found {G.number_of_edges()} close approaches', 'stage': 'model_a_complete'})}\n\n"
         await asyncio.sleep(0.2)
@@ -106,7 +411,9 @@ async def pipeline_generator(source: str, sample_minutes: int):
         yield f"data: {json.dumps({'log': '⚠️ MODEL B: Computing heuristic risk scores...', 'stage': 'model_b'})}\n\n"
         await asyncio.sleep(0.3)
         
-        heuristic_risk_scores(G)
+        with stage_timer("model_b", stage_timings):
+            heuristic_risk_scores(G)
+            analytics = ConjunctionAnalytics.from_graph(G, window_hours=sample_minutes / 60.0)
         
         yield f"data: {json.dumps({'log': '✅ MODEL B: Risk analysis complete', 'stage': 'model_b_complete'})}\n\n"
         await asyncio.sleep(0.2)
@@ -124,8 +431,9 @@ async def pipeline_generator(source: str, sample_minutes: int):
             yield f"data: {json.dumps({'log': f'  Negotiating {u} ↔ {v} ({min_dist}km, risk={risk})...', 'stage': 'model_c_processing'})}\n\n"
             await asyncio.sleep(0.1)
 
-            explanation = explain_edge(u, v, G)
-            llm = run_multi_llm_negotiation(u, v, min_dist)
+            with stage_timer("model_c", stage_timings):
+                explanation = explain_edge(u, v, G, analytics)
+                llm = run_multi_llm_negotiation(u, v, min_dist)
 
             edges_info.append({
                 "sat1": u,
@@ -146,18 +454,16 @@ async def pipeline_generator(source: str, sample_minutes: int):
         yield f"data: {json.dumps({'log': '📄 MODEL D: Generating mission report...', 'stage': 'model_d'})}\n\n"
         await asyncio.sleep(0.3)
         
-        report_html = generate_llm_mission_report(
-            edges_info,
-            out_html_path=LAST_REPORT_PATH
-        )
+        with stage_timer("model_d", stage_timings):
+            report_path = await generate_report_async(edges_info)
 
         yield f"data: {json.dumps({'log': '✅ MODEL D: Report generated successfully', 'stage': 'model_d_complete'})}\n\n"
         await asyncio.sleep(0.2)
 
-        # Save to global state
-        LAST_GRAPH = G
-        LAST_RISKS = edges_info
-        LAST_SATELLITES = list(G.nodes())
+        # Publish to the shared store
+        await asyncio.to_thread(
+            publish_snapshot, Snapshot(key, G, edges_info, sample_minutes / 60.0, analytics), report_path
+        )
 
         # Send final summary
         summary = {
@@ -167,22 +473,66 @@ async def pipeline_generator(source: str, sample_minutes: int):
                 "dataset": source,
                 "num_nodes": G.number_of_nodes(),
                 "num_edges": G.number_of_edges(),
-                "high_risk": sum(1 for r in edges_info if r["riskScore"] > 0.7)
+                "high_risk": sum(1 for r in edges_info if r["riskScore"] > 0.7),
+                "stage_timings": {k: round(v, 4) for k, v in stage_timings.items()},
             }
         }
+        await asyncio.to_thread(store.put, f"summary:{key}", {"summary": summary, "completed_at": time.time()})
         yield f"data: {json.dumps(summary)}\n\n"
 
     except Exception as e:
         yield f"data: {json.dumps({'error': str(e), 'stage': 'error'})}\n\n"
+    finally:
+        if lock_owner:
+            await asyncio.to_thread(store.release, f"compute:{key}", lock_owner)
+
+async def profiled_events(run_id: str, enabled: bool, events):
+    """Relay `events`, profiling the whole run when enabled."""
+    with profile_run(run_id, enabled):
+        async for event in events:
+            yield event
 
 # ============================================================
 # STREAMING ENDPOINT
 # ============================================================
 @app.post("/api/analyze")
-async def api_analyze_stream(source: str = "starlink", sample_minutes: int = 120):
-    """Streaming endpoint that returns Server-Sent Events"""
+async def api_analyze_stream(source: str = "starlink", sample_minutes: int = 120,
+                             primary_source: str = None, primary_ids: str = None,
+                             cloud_source: str = None, profile: bool = False):
+    """
+    Streaming endpoint that returns Server-Sent Events.
+
+    Pass `primary_source` (a dataset key) and/or `primary_ids` (comma-separated
+    NORAD IDs) to screen only those primaries against `source`.
+    Pass `cloud_source` (e.g. "cosmos") to screen that whole fragmentation
+    cloud against `source` using cloud envelopes.
+    `profile=true` (or PROFILE_RUNS=1) writes a cProfile dump for the run.
+
+    Identical requests are coalesced: while a pipeline for the same
+    parameters and catalog version is running, later requests subscribe
+    to its event stream (and `profile` follows the first request), and a
+    completed result is reused for ANALYZE_FRESHNESS_S seconds.
+    """
+    key = analysis_key(source, sample_minutes, primary_source, primary_ids, cloud_source)
+    record = await asyncio.to_thread(fresh_result, key)
+    if record is not None:
+        ANALYZE_REQUESTS.inc(outcome="fresh")
+        events = replay_result(key, record)
+    else:
+        run = INFLIGHT.get(key)
+        if run is None:
+            ANALYZE_REQUESTS.inc(outcome="run")
+            run_id = uuid.uuid4().hex[:12]
+            pipeline = pipeline_generator(source, sample_minutes, primary_source, primary_ids, run_id, cloud_source)
+            run = SharedRun(profiled_events(run_id, profiling_enabled(profile), pipeline))
+            INFLIGHT[key] = run
+            run.task.add_done_callback(lambda _, run=run: forget_run(key, run))
+        else:
+            ANALYZE_REQUESTS.inc(outcome="coalesced")
+        events = run.subscribe()
+
     return StreamingResponse(
-        pipeline_generator(source, sample_minutes),
+        events,
         media_type="text/event-stream",
         headers={
             "Cache-Control": "no-cache",
@@ -197,9 +547,8 @@ async def api_analyze_stream(source: str = "starlink", sample_minutes: int = 120
 
 @app.get("/api/stats")
 async def api_stats():
-    global LAST_GRAPH, LAST_RISKS
-
-    if LAST_GRAPH is None:
+    snapshot = await asyncio.to_thread(current_snapshot)
+    if snapshot is None:
         return {
             "totalSatellites": 0,
             "closeApproaches": 0,
@@ -207,49 +556,168 @@ async def api_stats():
             "lastAnalysis": None
         }
 
-    high_risk = sum(1 for r in LAST_RISKS if r["riskScore"] > 0.7)
+    high_risk = sum(1 for r in snapshot.risks if r["riskScore"] > 0.7)
 
     return {
-        "totalSatellites": LAST_GRAPH.number_of_nodes(),
-        "closeApproaches": LAST_GRAPH.number_of_edges(),
+        "totalSatellites": snapshot.graph.number_of_nodes(),
+        "closeApproaches": snapshot.graph.number_of_edges(),
         "highRiskEvents": high_risk,
         "lastAnalysis": "just now"
     }
 
 @app.get("/api/risks")
 async def api_risks():
-    return {"pairs": LAST_RISKS or []}
+    snapshot = await asyncio.to_thread(current_snapshot)
+    return {"pairs": snapshot.risks if snapshot else []}
 
 @app.get("/api/orbit-graph")
 async def api_orbit_graph():
-    if LAST_GRAPH is None:
+    snapshot = await asyncio.to_thread(current_snapshot)
+    if snapshot is None:
         return {"nodes": [], "edges": []}
 
-    nodes = list(LAST_GRAPH.nodes())
+    nodes = snapshot.satellites
     edges = [
         {
             "source": u,
             "target": v,
             "risk_score": data.get("risk_score", 0)
         }
-        for u, v, data in LAST_GRAPH.edges(data=True)
+        for u, v, data in snapshot.graph.edges(data=True)
     ]
 
     return {"nodes": nodes, "edges": edges}
 
-@app.post("/api/upload")
-async def api_upload(tle_file: UploadFile = File(...)):
-    global LAST_GRAPH, LAST_RISKS, LAST_SATELLITES
+@app.post("/api/monitor/diff")
+async def api_monitor_diff(payload: dict):
+    """Receive a conjunction diff from the screening daemon."""
+    conjunctions = payload.get("conjunctions", [])
+    diff = payload.get("diff", {})
 
-    path = os.path.join(DATA_DIR, "uploaded.tle")
-    content = await tle_file.read()
+    def append(state):
+        diffs, run = state["diffs"], state.get("run", 0)
+        # A restarted daemon starts a new session at tick 1: drop the old run's diffs
+        if not diffs or not same_monitor_run(diffs[-1], diff):
+            diffs, run = [], run + 1
+        return {"conjunctions": conjunctions, "run": run, "diffs": (diffs + [diff])[-MONITOR_DIFFS_KEPT:]}
 
-    with open(path, "wb") as f:
-        f.write(content)
+    await asyncio.to_thread(get_store().update, "monitor", append, default={"conjunctions": [], "diffs": []})
+    return {"status": "ok", "active": len(conjunctions)}
 
-    # 🔥 RE-RUN PIPELINE ON UPLOADED FILE
-    tles = load_local_tles("uploaded.tle")
-    tles = tles[:40]
+def same_monitor_run(previous: dict, diff: dict) -> bool:
+    """True when `diff` continues the daemon run that published `previous`."""
+    return previous.get("session") == diff.get("session") and diff.get("tick", 0) > previous.get("tick", 0)
+
+def monitor_window_hours(diff: dict) -> float:
+    """Screening horizon of a monitor diff (defaults to the daemon's 120 min)."""
+    try:
+        start = datetime.datetime.fromisoformat(diff["window_start"].rstrip("Z"))
+        end = datetime.datetime.fromisoformat(diff["window_end"].rstrip("Z"))
+        return max((end - start).total_seconds() / 3600.0, 1e-3)
+    except (KeyError, ValueError):
+        return 2.0
+
+def monitor_analytics():
+    """
+    This worker's analytics of the monitor set. Diffs published since the
+    last call are applied incrementally; after a gap or a daemon restart
+    (new session) the analytics are rebuilt from the current conjunction set.
+    """
+    global _MONITOR
+    store = get_store()
+    with _MONITOR_LOCK:
+        version = store.version("monitor")
+        if version == 0:
+            return None
+        cached_store, cached_version, run, tick, analytics = _MONITOR
+        if cached_store is store and cached_version == version:
+            return analytics
+
+        state = store.get("monitor")
+        pending = [d for d in state["diffs"] if d.get("tick", 0) > tick]
+        if (cached_store is store and analytics is not None and state.get("run", 0) == run
+                and pending and pending[0].get("tick") == tick + 1):
+            for diff in pending:
+                analytics.apply_diff(diff)
+        else:
+            last = state["diffs"][-1] if state["diffs"] else {}
+            analytics = ConjunctionAnalytics(window_hours=monitor_window_hours(last))
+            analytics.upsert_records(state["conjunctions"])
+        tick = state["diffs"][-1].get("tick", 0) if state["diffs"] else 0
+        _MONITOR = (store, version, state.get("run", 0), tick, analytics)
+        return analytics
+
+@app.get("/api/monitor")
+async def api_monitor(since_tick: int = 0):
+    """Current rolling-horizon conjunction set plus diffs after `since_tick`."""
+    state = await asyncio.to_thread(get_store().get, "monitor", {"conjunctions": [], "diffs": []})
+    return {
+        "conjunctions": state["conjunctions"],
+        "diffs": [d for d in state["diffs"] if d.get("tick", 0) > since_tick],
+    }
+
+# ============================================================
+# STREAMING UPLOAD INGESTION
+# ============================================================
+async def ingest_tle_upload(upload: UploadFile, path: str) -> dict:
+    """
+    Parse an upload chunk by chunk and write only valid TLEs to `path`.
+    Memory stays bounded by the chunk size. Uploads larger than
+    UPLOAD_MAX_BYTES are refused with stats["error"], before anything is
+    written when the declared size is already too large.
+    """
+    parser = TLEStreamParser()
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    stats = {"accepted": 0, "rejected": 0, "rejects": []}
+    too_large = f"upload exceeds {UPLOAD_MAX_BYTES // 2 ** 20} MB"
+    if (getattr(upload, "size", None) or 0) > UPLOAD_MAX_BYTES:
+        return {**stats, "error": too_large}
+
+    def write_valid(tles, out):
+        for name, l1, l2 in tles:
+            reason = validate_tle(name, l1, l2)
+            if reason:
+                stats["rejected"] += 1
+                if len(stats["rejects"]) < 20:
+                    stats["rejects"].append({"name": name, "reason": reason})
+                continue
+            out.write(f"{name}\n{l1}\n{l2}\n")
+            stats["accepted"] += 1
+
+    received = 0
+    with open(path, "w", encoding="utf-8") as out:
+        while True:
+            chunk = await upload.read(UPLOAD_CHUNK_BYTES)
+            if not chunk:
+                break
+            # The declared size can be missing; count what actually arrives
+            received += len(chunk)
+            if received > UPLOAD_MAX_BYTES:
+                break
+            write_valid(parser.feed(decoder.decode(chunk)), out)
+        else:
+            write_valid(parser.feed(decoder.decode(b"", final=True)) + parser.close(), out)
+    if received > UPLOAD_MAX_BYTES:
+        return {**stats, "error": too_large}
+
+    return stats
+
+
+def upload_path(catalog_id: str) -> str:
+    """Catalog file of an upload, DATA_DIR/uploads/<catalog_id>.tle."""
+    return os.path.join(DATA_DIR, UPLOAD_SUBDIR, f"{catalog_id}.tle")
+
+
+def remove_upload(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def screen_uploaded_catalog(filename: str):
+    """Model A + B over a whole uploaded catalog; Model C for the riskiest pairs."""
+    tles, catalog_report = load_local_catalog(filename)
 
     G = build_graph_from_tles(
         tles,
@@ -259,27 +727,163 @@ async def api_upload(tle_file: UploadFile = File(...)):
     )
 
     heuristic_risk_scores(G)
+    analytics = ConjunctionAnalytics.from_graph(G, window_hours=2.0)
 
+    ranked = sorted(G.edges(data=True), key=lambda e: e[2].get("risk_score", 0.0), reverse=True)
     edges_info = []
-    for u, v, data in G.edges(data=True):
-        llm = run_multi_llm_negotiation(u, v, data["min_distance_km"])
+    for idx, (u, v, data) in enumerate(ranked):
+        maneuver = ""
+        if idx < UPLOAD_NEGOTIATE_TOP:
+            maneuver = run_multi_llm_negotiation(u, v, data["min_distance_km"])["final_decision"]
         edges_info.append({
             "sat1": u,
             "sat2": v,
+            "minDistance": round(data["min_distance_km"], 2),
             "riskScore": data["risk_score"],
-            "maneuver": llm["final_decision"],
+            "maneuver": maneuver,
         })
 
-    LAST_GRAPH = G
-    LAST_RISKS = edges_info
-    LAST_SATELLITES = list(G.nodes())
+    return G, edges_info, catalog_report, analytics
+
+
+def create_job(job_id: str, record: dict):
+    """
+    Store a new job's status record and drop the records of jobs created
+    more than JOB_RETENTION_S ago (blocking; run it in a thread).
+    """
+    store = get_store()
+    now = time.time()
+    expired = []
+
+    def register(jobs):
+        expired[:] = [j for j, created in jobs if now - created > JOB_RETENTION_S]
+        return [[j, created] for j, created in jobs if now - created <= JOB_RETENTION_S] + [[job_id, now]]
 
-    return {"status": "uploaded_and_processed"}
+    store.update("job:index", register, default=[])
+    store.put(f"job:{job_id}", {"job_id": job_id, "created_at": now, **record})
+    for old in expired:
+        store.delete(f"job:{old}")
+        remove_upload(upload_path(old))   # job_id is the catalog id
 
 
+def update_job(job_id: str, **fields):
+    """Merge `fields` into a job's status record (blocking; run it in a thread)."""
+    get_store().update(f"job:{job_id}", lambda job: {**job, **fields}, default={"job_id": job_id})
+
+
+async def run_upload_job(job_id: str, filename: str):
+    await asyncio.to_thread(update_job, job_id, status="running")
+    try:
+        G, edges_info, catalog_report, analytics = await asyncio.to_thread(screen_uploaded_catalog, filename)
+        await asyncio.to_thread(
+            publish_snapshot, Snapshot(f"upload:{job_id}", G, edges_info, 2.0, analytics)
+        )
+    except Exception as e:
+        remove_upload(upload_path(job_id))
+        await asyncio.to_thread(update_job, job_id, status="error", error=str(e))
+        return
+
+    await asyncio.to_thread(
+        update_job,
+        job_id,
+        status="done",
+        num_nodes=G.number_of_nodes(),
+        num_edges=G.number_of_edges(),
+        duplicates=len(catalog_report["duplicates"]),
+    )
+
+
+@app.post("/api/upload")
+async def api_upload(tle_file: UploadFile = File(...)):
+    """
+    Stream a TLE upload into its own catalog file and start screening it
+    as a background job. Poll /api/jobs/{job_id} for the result.
+    Uploads over UPLOAD_MAX_MB are rejected. The catalog file is deleted
+    when the upload is rejected, the job fails or its record expires.
+    """
+    catalog_id = uuid.uuid4().hex[:12]
+    filename = os.path.join(UPLOAD_SUBDIR, f"{catalog_id}.tle")
+    os.makedirs(os.path.join(DATA_DIR, UPLOAD_SUBDIR), exist_ok=True)
+
+    stats = await ingest_tle_upload(tle_file, upload_path(catalog_id))
+    if stats["accepted"] == 0 or "error" in stats:
+        remove_upload(upload_path(catalog_id))
+        return {"status": "rejected", "catalog_id": catalog_id, **stats}
+
+    job_id = catalog_id
+    await asyncio.to_thread(create_job, job_id, {"catalog_id": catalog_id, "status": "queued", **stats})
+    task = asyncio.create_task(run_upload_job(job_id, filename))
+    BACKGROUND_TASKS.add(task)
+    task.add_done_callback(BACKGROUND_TASKS.discard)
+
+    return {"status": "accepted", "catalog_id": catalog_id, "job_id": job_id, **stats}
+
+
+@app.get("/api/jobs/{job_id}")
+async def api_job_status(job_id: str):
+    job = await asyncio.to_thread(get_store().get, f"job:{job_id}")
+    if job is None:
+        return {"error": "job not found"}
+    return job
+
+
+@app.get("/api/forecast")
+async def api_forecast(source: str = "starlink", horizon_days: float = 7.0, step_s: float = 30.0,
+                       threshold_km: float = 10.0, memory_mb: float = 256, timelines: bool = False):
+    """
+    Long-horizon forecast of every close approach over `horizon_days`:
+    compact event rows plus encounter counts per day. `timelines=true`
+    also returns the per-pair encounter timelines. `memory_mb` is capped
+    at MAX_MEMORY_BUDGET_MB.
+    """
+    if source not in TLE_SOURCES:
+        return {"error": "Invalid TLE dataset source"}
+    if not 0 < horizon_days <= MAX_HORIZON_DAYS:
+        return {"error": f"horizon_days must be in (0, {MAX_HORIZON_DAYS}]"}
+
+    tles = load_local_tles(TLE_SOURCES[source])
+    memory_mb = min(memory_mb, MAX_MEMORY_BUDGET_MB)
+    try:
+        result = await asyncio.to_thread(
+            forecast_conjunctions, tles, horizon_days, step_s, threshold_km, memory_mb
+        )
+    except ValueError as e:
+        return {"error": str(e)}
+    if timelines:
+        result["timelines"] = pair_timelines(result)
+    return result
+
+
+def graph_summary(scope: str, top: int):
+    """Analytics summary of the pipeline or monitor graph, or None (blocking; run it in a thread)."""
+    if scope == "pipeline":
+        snapshot = current_snapshot()
+        analytics = snapshot.analytics if snapshot else None
+        return analytics.summary(top) if analytics is not None else None
+    # Diffs are applied in place, so summarize under the monitor lock
+    with _MONITOR_LOCK:
+        analytics = monitor_analytics()
+        return analytics.summary(top) if analytics is not None else None
+
+
+@app.get("/api/graph-analytics")
+async def api_graph_analytics(scope: str = "pipeline", top: int = 10):
+    """
+    Conjunction clustering of the last analysis (`scope=pipeline`) or of
+    the rolling monitor set (`scope=monitor`): connected components,
+    k-cores, per-object conjunction rates and hotspot altitude bands.
+    """
+    if scope not in ("pipeline", "monitor"):
+        return {"error": "scope must be 'pipeline' or 'monitor'"}
+    summary = await asyncio.to_thread(graph_summary, scope, max(1, min(top, 100)))
+    if summary is None:
+        return {"error": f"No {scope} graph yet."}
+    return {"scope": scope, **summary}
+
 @app.get("/api/satellites")
 async def api_satellites():
-    sats = LAST_SATELLITES or []
+    snapshot = await asyncio.to_thread(current_snapshot)
+    sats = snapshot.satellites if snapshot else []
     return {"satellites": [
         {"name": s, "inclination": 55, "period": 95, "status": "OK"}
         for s in sats
@@ -289,10 +893,29 @@ async def api_satellites():
 async def api_simulate(data: dict):
     return {"new_distance": data["distance"] + 15}
 
+@app.get("/metrics")
+async def metrics():
+    """
+    Prometheus text exposition of this worker's metrics. Counters are
+    per process: under `--workers N` each scrape reaches one worker, so
+    scrape every worker (or run one) for totals.
+    """
+    body = f"# worker pid {os.getpid()}\n" + REGISTRY.render()
+    return PlainTextResponse(body, media_type="text/plain; version=0.0.4")
+
 @app.get("/api/report/pdf")
 async def api_report_pdf():
-    if os.path.exists(LAST_REPORT_PATH):
-        return FileResponse(LAST_REPORT_PATH, filename="collision_report.html")
+    snapshot = await asyncio.to_thread(current_snapshot)
+    store = get_store()
+    report_path = await asyncio.to_thread(store.get, f"report:{snapshot.key}") if snapshot else None
+
+    # Reports are cached per snapshot; build one if the last run has none yet
+    if snapshot is not None and (report_path is None or not os.path.exists(report_path)):
+        report_path = await generate_report_async(snapshot.risks)
+        await asyncio.to_thread(store.put, f"report:{snapshot.key}", report_path)
+
+    if report_path and os.path.exists(report_path):
+        return FileResponse(report_path, media_type="application/pdf", filename="collision_report.pdf")
     return {"error": "report not found"}
 
 if __name__ == "__main__":
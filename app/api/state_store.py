@@ -0,0 +1,217 @@
+# -----------------------------
+# File: app/api/state_store.py
+# -----------------------------
+"""
+Shared API state for multi-worker deployments.
+
+`uvicorn --workers N` runs N processes. Analysis snapshots, upload-job
+status and the monitor set have to be visible to every worker, and one
+catalog + parameters combination should be computed by one worker only.
+STATE_BACKEND selects the store:
+    sqlite   a WAL-mode SQLite file (STATE_DB) shared by every worker on
+             the host (default)
+    memory   process-local dicts; the single-worker stand-in, no files
+Both backends provide the small subset of Redis that the API uses:
+versioned JSON values (get / put / update / version / delete) and named
+locks that expire (acquire / release / locked).
+"""
+import contextlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Tuple
+
+DEFAULT_STATE_DB = ".api_state/state.db"
+
+
+def _encode(value: Any) -> str:
+    # numpy scalars/arrays (graph attributes) serialize as plain numbers/lists
+    return json.dumps(value, separators=(",", ":"), default=lambda o: o.tolist())
+
+
+class MemoryStore:
+    """Process-local store with the same semantics as SQLiteStore."""
+
+    name = "memory"
+
+    def __init__(self):
+        self._values: Dict[str, Tuple[int, str]] = {}
+        self._locks: Dict[str, Tuple[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._values.get(key)
+        return default if entry is None else json.loads(entry[1])
+
+    def version(self, key: str) -> int:
+        with self._lock:
+            entry = self._values.get(key)
+        return entry[0] if entry else 0
+
+    def put(self, key: str, value: Any) -> int:
+        text = _encode(value)
+        with self._lock:
+            version = self._values.get(key, (0, None))[0] + 1
+            self._values[key] = (version, text)
+        return version
+
+    def update(self, key: str, fn: Callable[[Any], Any], default: Any = None) -> Any:
+        """Atomically replace the value with fn(current value or `default`)."""
+        with self._lock:
+            version, text = self._values.get(key, (0, None))
+            value = fn(default if text is None else json.loads(text))
+            self._values[key] = (version + 1, _encode(value))
+        return value
+
+    def delete(self, key: str):
+        with self._lock:
+            self._values.pop(key, None)
+
+    def acquire(self, name: str, owner: str, ttl_s: float) -> bool:
+        now = time.time()
+        with self._lock:
+            held = self._locks.get(name)
+            if held and held[0] != owner and held[1] > now:
+                return False
+            self._locks[name] = (owner, now + ttl_s)
+            return True
+
+    def release(self, name: str, owner: str):
+        with self._lock:
+            if self._locks.get(name, (None,))[0] == owner:
+                del self._locks[name]
+
+    def locked(self, name: str) -> bool:
+        with self._lock:
+            held = self._locks.get(name)
+            return bool(held and held[1] > time.time())
+
+
+class SQLiteStore:
+    """
+    Store backed by one SQLite file; every worker process (and thread)
+    opens its own connection. WAL mode lets readers run while a worker
+    publishes a snapshot.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: Path = DEFAULT_STATE_DB):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        with self._tx() as db:
+            db.execute("CREATE TABLE IF NOT EXISTS kv ("
+                       "key TEXT PRIMARY KEY, version INTEGER NOT NULL, value TEXT NOT NULL)")
+            db.execute("CREATE TABLE IF NOT EXISTS locks ("
+                       "name TEXT PRIMARY KEY, owner TEXT NOT NULL, expires REAL NOT NULL)")
+
+    def _db(self) -> sqlite3.Connection:
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=30.0, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+        return db
+
+    @contextlib.contextmanager
+    def _tx(self):
+        db = self._db()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            yield db
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        db.execute("COMMIT")
+
+    def get(self, key: str, default: Any = None) -> Any:
+        row = self._db().execute("SELECT value FROM kv WHERE key = ?", (key,)).fetchone()
+        return default if row is None else json.loads(row[0])
+
+    def version(self, key: str) -> int:
+        row = self._db().execute("SELECT version FROM kv WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else 0
+
+    def put(self, key: str, value: Any) -> int:
+        text = _encode(value)
+        with self._tx() as db:
+            db.execute("INSERT INTO kv (key, version, value) VALUES (?, 1, ?) "
+                       "ON CONFLICT(key) DO UPDATE SET version = version + 1, value = excluded.value",
+                       (key, text))
+            return db.execute("SELECT version FROM kv WHERE key = ?", (key,)).fetchone()[0]
+
+    def update(self, key: str, fn: Callable[[Any], Any], default: Any = None) -> Any:
+        """Atomically replace the value with fn(current value or `default`)."""
+        with self._tx() as db:
+            row = db.execute("SELECT value FROM kv WHERE key = ?", (key,)).fetchone()
+            value = fn(default if row is None else json.loads(row[0]))
+            db.execute("INSERT INTO kv (key, version, value) VALUES (?, 1, ?) "
+                       "ON CONFLICT(key) DO UPDATE SET version = version + 1, value = excluded.value",
+                       (key, _encode(value)))
+        return value
+
+    def delete(self, key: str):
+        with self._tx() as db:
+            db.execute("DELETE FROM kv WHERE key = ?", (key,))
+
+    def acquire(self, name: str, owner: str, ttl_s: float) -> bool:
+        now = time.time()
+        with self._tx() as db:
+            row = db.execute("SELECT owner, expires FROM locks WHERE name = ?", (name,)).fetchone()
+            if row and row[0] != owner and row[1] > now:
+                return False
+            db.execute("INSERT OR REPLACE INTO locks (name, owner, expires) VALUES (?, ?, ?)",
+                       (name, owner, now + ttl_s))
+            return True
+
+    def release(self, name: str, owner: str):
+        with self._tx() as db:
+            db.execute("DELETE FROM locks WHERE name = ? AND owner = ?", (name, owner))
+
+    def locked(self, name: str) -> bool:
+        row = self._db().execute("SELECT expires FROM locks WHERE name = ?", (name,)).fetchone()
+        return bool(row and row[0] > time.time())
+
+
+# -------------------------------------------------------
+# Selection
+# -------------------------------------------------------
+_STORE = None
+_STORE_LOCK = threading.Lock()
+
+
+def store_from_env():
+    kind = os.getenv("STATE_BACKEND", "sqlite").lower()
+    if kind == "sqlite":
+        return SQLiteStore(Path(os.getenv("STATE_DB", DEFAULT_STATE_DB)))
+    if kind == "memory":
+        return MemoryStore()
+    raise ValueError(f"Unknown STATE_BACKEND: {kind!r}")
+
+
+def get_store():
+    """The process-wide store, built from the environment on first use."""
+    global _STORE
+    with _STORE_LOCK:
+        if _STORE is None:
+            _STORE = store_from_env()
+        return _STORE
+
+
+@contextlib.contextmanager
+def use_store(store):
+    """Temporarily replace the process-wide store (tests)."""
+    global _STORE
+    with _STORE_LOCK:
+        saved, _STORE = _STORE, store
+    try:
+        yield store
+    finally:
+        with _STORE_LOCK:
+            _STORE = saved
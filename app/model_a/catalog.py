@@ -0,0 +1,192 @@
+# ---------------------------------------------
+# File: app/model_a/catalog.py
+# ---------------------------------------------
+"""
+Model A: Catalog merge layer
+
+Merges TLE catalogs keyed by NORAD catalog number instead of name:
+- validates line format and checksums (rejects are reported),
+- keeps the freshest epoch when an object appears in several catalogs,
+- gives every object a unique node name (fragments such as
+  "COSMOS 2251 DEB" share one name across hundreds of pieces).
+"""
+
+import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+TLE = Tuple[str, str, str]   # (name, line1, line2)
+
+MAX_LINE_CHARS = 1024  # longer "lines" in a stream are garbage, not TLEs
+
+
+# -------------------------------------------------------
+# 1) Line-level helpers
+# -------------------------------------------------------
+def norad_id(l1: str) -> str:
+    """Return the NORAD catalog number field (columns 3-7) of TLE line 1."""
+    return l1[2:7].strip()
+
+
+def tle_checksum(line: str) -> int:
+    """Modulo-10 checksum over columns 1-68 (digits count, '-' counts as 1)."""
+    total = 0
+    for ch in line[:68]:
+        if ch.isdigit():
+            total += int(ch)
+        elif ch == "-":
+            total += 1
+    return total % 10
+
+
+def checksum_ok(line: str) -> bool:
+    return len(line) >= 69 and line[68].isdigit() and int(line[68]) == tle_checksum(line)
+
+
+def tle_epoch(l1: str) -> datetime.datetime:
+    """Epoch of a TLE from line 1 (columns 19-32, YYDDD.DDDDDDDD)."""
+    yy = int(l1[18:20])
+    year = 2000 + yy if yy < 57 else 1900 + yy
+    day_of_year = float(l1[20:32])
+    return datetime.datetime(year, 1, 1) + datetime.timedelta(days=day_of_year - 1)
+
+
+def validate_tle(name: str, l1: str, l2: str) -> Optional[str]:
+    """Return a reject reason, or None when the TLE is usable."""
+    if not (l1.startswith("1 ") and l2.startswith("2 ")):
+        return "bad line numbers"
+    if len(l1) < 69 or len(l2) < 69:
+        return "truncated line"
+    if not checksum_ok(l1):
+        return "line 1 checksum mismatch"
+    if not checksum_ok(l2):
+        return "line 2 checksum mismatch"
+    if norad_id(l1) != l2[2:7].strip():
+        return "NORAD ID differs between lines"
+    try:
+        tle_epoch(l1)
+    except ValueError:
+        return "bad epoch"
+    return None
+
+
+# -------------------------------------------------------
+# 2) Merge
+# -------------------------------------------------------
+def merge_catalogs(sources: Dict[str, Iterable[TLE]], unique_names: bool = True):
+    """
+    Merge several catalogs into one list with a single entry per NORAD ID.
+
+    `sources` maps a source label (e.g. file name) to its TLEs. When an
+    object appears more than once, the TLE with the latest epoch wins.
+
+    Returns (tles, report) where report is a dict:
+        {"total", "unique", "duplicates": [...], "rejects": [...]}
+    """
+    best: Dict[str, dict] = {}
+    duplicates, rejects = [], []
+    total = 0
+
+    for source, tles in sources.items():
+        for name, l1, l2 in tles:
+            total += 1
+            reason = validate_tle(name, l1, l2)
+            if reason:
+                rejects.append({"source": source, "name": name, "reason": reason})
+                continue
+
+            sat_id = norad_id(l1)
+            entry = {"name": name, "l1": l1, "l2": l2, "source": source, "epoch": tle_epoch(l1)}
+            current = best.get(sat_id)
+            if current is None:
+                best[sat_id] = entry
+                continue
+
+            keep, drop = (entry, current) if entry["epoch"] > current["epoch"] else (current, entry)
+            best[sat_id] = keep
+            duplicates.append({
+                "norad_id": sat_id,
+                "name": name,
+                "kept": keep["source"],
+                "dropped": drop["source"],
+                "kept_epoch": keep["epoch"].isoformat(),
+                "dropped_epoch": drop["epoch"].isoformat(),
+            })
+
+    merged = []
+    name_counts: Dict[str, int] = {}
+    for entry in best.values():
+        name_counts[entry["name"]] = name_counts.get(entry["name"], 0) + 1
+    for sat_id, entry in best.items():
+        name = entry["name"]
+        if unique_names and name_counts[name] > 1:
+            name = f"{name} [{sat_id}]"
+        merged.append((name, entry["l1"], entry["l2"]))
+
+    report = {
+        "total": total,
+        "unique": len(merged),
+        "duplicates": duplicates,
+        "rejects": rejects,
+    }
+    return merged, report
+
+
+# -------------------------------------------------------
+# 3) Incremental parsing
+# -------------------------------------------------------
+class TLEStreamParser:
+    """
+    Incremental TLE parser for streamed text.
+
+    feed() accepts arbitrary text chunks (lines may be split across
+    chunks) and returns the TLE triples completed so far; only the
+    trailing partial line and at most two pending lines are buffered.
+    Two-line element sets without a name line are named by NORAD ID.
+    """
+
+    def __init__(self):
+        self._partial = ""
+        self._pending: List[str] = []
+
+    def _push_line(self, line: str, out: List[TLE]):
+        line = line.strip()
+        if not line:
+            return
+        self._pending.append(line)
+
+        # "<name>", "1 ...", "2 ..."
+        if (len(self._pending) == 3 and self._pending[1].startswith("1 ")
+                and self._pending[2].startswith("2 ")):
+            out.append(tuple(self._pending))
+            self._pending = []
+        # "1 ...", "2 ..." with no name line
+        elif (len(self._pending) == 2 and self._pending[0].startswith("1 ")
+              and self._pending[1].startswith("2 ")):
+            l1, l2 = self._pending
+            out.append((norad_id(l1), l1, l2))
+            self._pending = []
+        elif len(self._pending) == 3:
+            # Out of sync: drop the oldest line and keep scanning
+            self._pending.pop(0)
+
+    def feed(self, text: str) -> List[TLE]:
+        out: List[TLE] = []
+        lines = (self._partial + text).split("\n")
+        self._partial = lines.pop()
+        if len(self._partial) > MAX_LINE_CHARS:
+            self._partial = ""
+        for line in lines:
+            self._push_line(line, out)
+        return out
+
+    def close(self) -> List[TLE]:
+        out: List[TLE] = []
+        if self._partial:
+            self._push_line(self._partial, out)
+            self._partial = ""
+        return out
+
+
+def format_merge_report(report: dict) -> str:
+    return (f"{report['unique']} unique objects from {report['total']} TLEs "
+            f"({len(report['duplicates'])} duplicates, {len(report['rejects'])} rejected)")
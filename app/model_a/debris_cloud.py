@@ -0,0 +1,130 @@
+# ---------------------------------------------
+# File: app/model_a/debris_cloud.py
+# ---------------------------------------------
+"""
+Model A: Debris-cloud screening
+
+Fragmentation clouds (e.g. COSMOS 2251, IRIDIUM 33 debris) contain
+hundreds of pieces from one parent. Fragments are grouped by their
+parent's international designator (launch year + number, TLE line 1
+columns 10-14), and each group is bisected by orbital radius until the
+sub-cloud is compact (ball radius <= `max_radius_km`, fresh clouds) or
+a thin shell (radial band <= `max_band_km`, old clouds spread along
+track). An envelope keeps, per time sample, the centroid, the ball
+radius and the band [r_lo, r_hi] of geocentric distances, so for every
+member
+
+    |target - member| >= max(|target - centroid| - radius,
+                             r_lo - |target|, |target| - r_hi)
+
+Targets are screened against envelopes first; only cloud/target pairs
+whose bound drops below the threshold are expanded to individual
+fragments, and only at the samples where it does. Failed (NaN) samples
+are left out of the envelope at that sample only, so the result is
+identical to screening every fragment individually.
+"""
+
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+DEFAULT_MAX_RADIUS_KM = 500.0
+DEFAULT_MAX_BAND_KM = 400.0
+
+
+def parent_designator(l1: str) -> str:
+    """International designator of the parent launch ("93036" for 1993-036)."""
+    return l1[9:14].strip()
+
+
+def _envelope(track: np.ndarray) -> dict:
+    """
+    Per-sample centroid (T, 3), ball radius (T,) and radial band of
+    `track` (M, T, 3) over the members with a valid sample. Samples where
+    no member is valid are NaN, so no target is ever near them.
+    """
+    valid = ~np.isnan(track).any(axis=2)
+    count = valid.sum(axis=0)
+    centroid = np.where(valid[..., None], track, 0.0).sum(axis=0) / np.maximum(count, 1)[:, None]
+    centroid[count == 0] = np.nan
+    # fmax/fmin skip NaN entries (and stay NaN when a sample has none)
+    radius = np.fmax.reduce(np.linalg.norm(track - centroid, axis=2), axis=0)
+    r = np.linalg.norm(track, axis=2)
+    return {"centroid": centroid, "radius": radius,
+            "r_lo": np.fmin.reduce(r, axis=0), "r_hi": np.fmax.reduce(r, axis=0)}
+
+
+def _split(positions: np.ndarray, members: np.ndarray,
+           max_radius_km: float, max_band_km: float) -> List[np.ndarray]:
+    """Bisect `members` by mean orbital radius until each envelope is compact or thin."""
+    out, stack = [], [members]
+    while stack:
+        idx = stack.pop()
+        env = _envelope(positions[idx])
+        if (len(idx) == 1 or np.fmax.reduce(env["radius"]) <= max_radius_km
+                or np.fmax.reduce(env["r_hi"] - env["r_lo"]) <= max_band_km):
+            out.append(idx)
+            continue
+        mean_r = np.nanmean(np.linalg.norm(positions[idx], axis=2), axis=1)
+        order = np.argsort(mean_r)
+        half = len(idx) // 2
+        stack.extend([idx[order[:half]], idx[order[half:]]])
+    return out
+
+
+def build_clouds(positions: np.ndarray, designators: List[str],
+                 max_radius_km: float = DEFAULT_MAX_RADIUS_KM,
+                 max_band_km: float = DEFAULT_MAX_BAND_KM) -> List[dict]:
+    """
+    Group fragments into sub-cloud envelopes.
+
+    `positions` is (n_fragments, n_times, 3). Failed (NaN) samples never
+    match, as in per-pair screening: they are masked per sample, and
+    fragments that failed at every sample are left out. Returns envelope
+    dicts with `members` (indices into positions), `centroid`, `radius`,
+    `r_lo` and `r_hi`.
+    """
+    groups: Dict[str, List[int]] = {}
+    valid = (~np.isnan(positions).any(axis=2)).any(axis=1)
+    for idx, key in enumerate(designators):
+        if valid[idx]:
+            groups.setdefault(key, []).append(idx)
+
+    clouds = []
+    for members in groups.values():
+        for part in _split(positions, np.array(members), max_radius_km, max_band_km):
+            clouds.append({"members": part, **_envelope(positions[part])})
+    return clouds
+
+
+def screen_clouds(clouds: List[dict], cloud_positions: np.ndarray, target_positions: np.ndarray,
+                  threshold_km: float):
+    """
+    Screen every target against every cloud envelope, expanding only
+    clouds that come within `threshold_km` of a target.
+
+    Returns (hits, evaluations): hits are (fragment_idx, target_idx,
+    min_distance_km) for pairs closer than the threshold at some sample,
+    evaluations is the number of distances computed.
+    """
+    hits: List[Tuple[int, int, float]] = []
+    evaluations = 0
+    for cloud in clouds:
+        d = np.linalg.norm(target_positions - cloud["centroid"], axis=2)   # (n_targets, T)
+        r_t = np.linalg.norm(target_positions, axis=2)
+        bound = np.maximum.reduce([d - cloud["radius"], cloud["r_lo"] - r_t, r_t - cloud["r_hi"]])
+        near = bound < threshold_km
+        evaluations += d.size
+
+        # Expand: every member against the near (target, sample) pairs only
+        ti, si = np.nonzero(near)
+        if ti.size == 0:
+            continue
+        members = cloud["members"]
+        md = np.linalg.norm(cloud_positions[members][:, si] - target_positions[ti, si], axis=2)
+        evaluations += md.size
+        starts = np.flatnonzero(np.r_[True, ti[1:] != ti[:-1]])
+        per_target = np.fmin.reduceat(md, starts, axis=1)    # (members, near targets); skips NaN samples
+        for m, k in zip(*np.nonzero(per_target < threshold_km)):
+            hits.append((int(members[m]), int(ti[starts[k]]), float(per_target[m, k])))
+    return hits, evaluations
@@ -0,0 +1,261 @@
+# ---------------------------------------------
+# File: app/model_a/ephemeris_cache.py
+# ---------------------------------------------
+"""
+Model A: Ephemeris cache
+
+Propagated position/velocity arrays for a time grid (start epoch, step,
+sample count). In memory, states are cached per object (keyed by its
+element set), so any call that includes an object already propagated on
+the same grid reuses it: fleet screens, all-vs-all screens, subsets and
+maneuver what-ifs share entries. On disk, each call's block is stored
+as an .npz file (float32 by default) keyed by its whole object list,
+with LRU eviction by total size, so repeated analyses of the same
+catalog skip SGP4 across restarts and workers.
+
+Screens request a window [now, now + sample_minutes]; propagate_window()
+serves it from the shared grid of the current refresh interval, which
+starts at most EPHEMERIS_REFRESH_S before now and is long enough to
+cover the window wherever `now` falls in the interval.
+
+Environment:
+    EPHEMERIS_CACHE_DIR     on-disk location (default .ephemeris_cache)
+    EPHEMERIS_CACHE_MAX_MB  on-disk size cap (default 512)
+    EPHEMERIS_MEMORY_MB     in-memory size cap (default 256)
+    EPHEMERIS_CACHE_DTYPE   float32 | float64 (default float32)
+    EPHEMERIS_REFRESH_S     grid start quantum in seconds (default 600)
+    EPHEMERIS_CACHE=0       disable the cache
+"""
+
+import datetime
+import hashlib
+import math
+import os
+import struct
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import List, Tuple
+
+import numpy as np
+from sgp4.api import Satrec, SatrecArray, jday
+
+from app.telemetry.metrics import REGISTRY
+
+CACHE_DIR = Path(os.getenv("EPHEMERIS_CACHE_DIR", ".ephemeris_cache"))
+CACHE_MAX_BYTES = int(float(os.getenv("EPHEMERIS_CACHE_MAX_MB", "512")) * 2 ** 20)
+CACHE_DTYPE = np.dtype(os.getenv("EPHEMERIS_CACHE_DTYPE", "float32"))
+REFRESH_SECONDS = int(os.getenv("EPHEMERIS_REFRESH_S", "600"))
+CACHE_ENABLED = os.getenv("EPHEMERIS_CACHE", "1") not in ("0", "false", "no")
+MEMORY_MAX_BYTES = int(float(os.getenv("EPHEMERIS_MEMORY_MB", "256")) * 2 ** 20)
+
+CACHE_LOOKUPS = REGISTRY.counter("ephemeris_cache_lookups_total", "Ephemeris cache lookups by result")
+OBJECTS_PROPAGATED = REGISTRY.counter(
+    "orbit_objects_propagated_total", "Objects propagated with SGP4"
+)
+
+_UNIX_EPOCH = datetime.datetime(1970, 1, 1)
+
+# (element-set digest, grid) -> (r, v) of one object, (n_times, 3) each
+_memory: "OrderedDict[Tuple[bytes, str], Tuple[np.ndarray, np.ndarray]]" = OrderedDict()
+_memory_bytes = 0
+_lock = threading.Lock()
+
+
+# -------------------------------------------------------
+# 1) Keys and time grid
+# -------------------------------------------------------
+def satrec_digest(sat: Satrec) -> bytes:
+    """Digest of the element set a Satrec was built from (its TLE content)."""
+    fields = (sat.satnum, sat.jdsatepoch, sat.jdsatepochF, sat.no_kozai, sat.ecco,
+              sat.inclo, sat.nodeo, sat.argpo, sat.mo, sat.bstar, sat.ndot, sat.nddot)
+    return hashlib.sha1(struct.pack("<q11d", *fields)).digest()
+
+
+def grid_key(start: datetime.datetime, step_min: float, count: int) -> str:
+    return f"{start.isoformat()}|{step_min}|{count}|{CACHE_DTYPE.name}"
+
+
+def cache_key(digests: List[bytes], grid: str) -> str:
+    """On-disk key of one block: every object's element set plus the grid."""
+    h = hashlib.sha1()
+    for digest in digests:
+        h.update(digest)
+    h.update(f"|{grid}".encode())
+    return h.hexdigest()
+
+
+def grid_start(now: datetime.datetime = None) -> datetime.datetime:
+    """Quantize `now` down to the refresh interval so nearby runs share a grid."""
+    now = now or datetime.datetime.utcnow()
+    quantum = max(1, REFRESH_SECONDS)
+    seconds = int((now - _UNIX_EPOCH).total_seconds()) // quantum * quantum
+    return _UNIX_EPOCH + datetime.timedelta(seconds=seconds)
+
+
+def time_grid(start: datetime.datetime, step_min: float, count: int):
+    """Julian-date arrays (jd, fr) for `count` samples every `step_min` minutes."""
+    jd0, fr0 = jday(start.year, start.month, start.day,
+                    start.hour, start.minute, start.second + start.microsecond * 1e-6)
+    fr = fr0 + np.arange(count) * (step_min / 1440.0)
+    return np.full(count, jd0), fr
+
+
+# -------------------------------------------------------
+# 2) Propagation
+# -------------------------------------------------------
+def propagate_states(sats: List[Satrec], jd: np.ndarray, fr: np.ndarray):
+    """
+    Vectorized SGP4 over all satellites and times.
+    Returns (r, v) arrays of shape (n_sats, n_times, 3); errors are NaN.
+    """
+    if not sats:
+        empty = np.empty((0, len(jd), 3))
+        return empty, empty.copy()
+    e, r, v = SatrecArray(sats).sgp4(jd, fr)
+    OBJECTS_PROPAGATED.inc(len(sats))
+    bad = e != 0
+    r[bad] = np.nan
+    v[bad] = np.nan
+    return r, v
+
+
+# -------------------------------------------------------
+# 3) Cached entry point
+# -------------------------------------------------------
+def _readonly(a: np.ndarray) -> np.ndarray:
+    # Cached arrays are shared between callers
+    a.setflags(write=False)
+    return a
+
+
+def _load(path: Path):
+    try:
+        with np.load(path) as data:
+            r, v = data["r"], data["v"]
+        os.utime(path)   # LRU: mark as recently used
+        return _readonly(r), _readonly(v)
+    except Exception as e:
+        print(f"[WARN] Dropping unreadable ephemeris cache entry {path}: {e}")
+        path.unlink(missing_ok=True)
+        return None
+
+
+def _store(path: Path, r: np.ndarray, v: np.ndarray):
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.stem}.{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(tmp, "wb") as f:
+        np.savez(f, r=r.astype(CACHE_DTYPE), v=v.astype(CACHE_DTYPE))
+    os.replace(tmp, path)
+    evict()
+
+
+def evict(max_bytes: int = None):
+    """Delete least recently used entries until the store fits `max_bytes`."""
+    max_bytes = CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    if not CACHE_DIR.exists():
+        return
+    entries = []
+    for p in CACHE_DIR.glob("*.npz"):
+        try:
+            st = p.stat()
+            entries.append((st.st_mtime, st.st_size, p))
+        except FileNotFoundError:
+            continue
+    total = sum(size for _, size, _ in entries)
+    for _, size, p in sorted(entries, key=lambda e: e[0]):
+        if total <= max_bytes:
+            break
+        p.unlink(missing_ok=True)
+        total -= size
+
+
+def _remember(keys: List[Tuple[bytes, str]], r: np.ndarray, v: np.ndarray):
+    """Add per-object rows to the in-memory LRU, evicting down to MEMORY_MAX_BYTES."""
+    global _memory_bytes
+    with _lock:
+        for k, key in enumerate(keys):
+            if key in _memory:
+                continue
+            row = (_readonly(r[k].copy()), _readonly(v[k].copy()))
+            _memory[key] = row
+            _memory_bytes += row[0].nbytes + row[1].nbytes
+        while _memory_bytes > MEMORY_MAX_BYTES and _memory:
+            _, (r_old, v_old) = _memory.popitem(last=False)
+            _memory_bytes -= r_old.nbytes + v_old.nbytes
+
+
+def clear_memory():
+    global _memory_bytes
+    with _lock:
+        _memory.clear()
+        _memory_bytes = 0
+
+
+def propagate_cached(sats: List[Satrec], start: datetime.datetime, step_min: float, count: int):
+    """
+    Positions and velocities (km, km/s, TEME) for `sats` on the grid
+    start + k * step_min, k < count. Objects already propagated on this
+    grid come from memory; the rest from this object list's disk block,
+    or SGP4 (only for the objects not in memory). Arrays are read-only.
+    """
+    jd, fr = time_grid(start, step_min, count)
+    if not CACHE_ENABLED or not sats:
+        return propagate_states(sats, jd, fr)
+
+    grid = grid_key(start, step_min, count)
+    keys = [(satrec_digest(sat), grid) for sat in sats]
+    with _lock:
+        rows = [_memory.get(key) for key in keys]
+        for key, row in zip(keys, rows):
+            if row is not None:
+                _memory.move_to_end(key)
+    missing = [k for k, row in enumerate(rows) if row is None]
+
+    if not missing:
+        CACHE_LOOKUPS.inc(result="memory")
+        r = np.stack([row[0] for row in rows])
+        v = np.stack([row[1] for row in rows])
+        return _readonly(r), _readonly(v)
+
+    path = CACHE_DIR / f"{cache_key([key[0] for key in keys], grid)}.npz"
+    loaded = _load(path) if path.exists() else None
+    if loaded is not None:
+        CACHE_LOOKUPS.inc(result="disk")
+        r, v = loaded
+        _remember(keys, r, v)
+        return r, v
+
+    CACHE_LOOKUPS.inc(result="miss" if len(missing) == len(sats) else "partial")
+    r_new, v_new = propagate_states([sats[k] for k in missing], jd, fr)
+    r = np.empty((len(sats), count, 3), dtype=CACHE_DTYPE)
+    v = np.empty_like(r)
+    r[missing], v[missing] = r_new, v_new
+    for k, row in enumerate(rows):
+        if row is not None:
+            r[k], v[k] = row
+    _store(path, r, v)
+    _remember([keys[k] for k in missing], r[missing], v[missing])
+    return _readonly(r), _readonly(v)
+
+
+def propagate_window(sats: List[Satrec], sample_minutes: float, step_min: float,
+                     now: datetime.datetime = None):
+    """
+    States for the window [now, now + sample_minutes] every `step_min`.
+
+    Uses the grid of the current refresh interval (start = grid_start(now),
+    a fixed count covering any `now` in that interval) so calls in one
+    interval share cache entries, and returns the slice that starts at the
+    first grid sample at or after `now`: (r, v, window_start).
+    """
+    now = now or datetime.datetime.utcnow()
+    start = grid_start(now)
+    step_s = step_min * 60.0
+    n_window = int(math.ceil(sample_minutes / step_min - 1e-9)) + 1
+    count = int(math.ceil(max(1, REFRESH_SECONDS) / step_s)) + n_window
+    first = int(math.ceil((now - start).total_seconds() / step_s - 1e-9))
+
+    r, v = propagate_cached(sats, start, step_min, count)
+    window = slice(first, first + n_window)
+    return r[:, window], v[:, window], start + datetime.timedelta(seconds=first * step_s)
@@ -14,7 +14,19 @@ import numpy as np
 import datetime
 import networkx as nx
 from pathlib import Path
-from typing import List, Tuple
+from typing import Iterable, List, Tuple
+
+from app.model_a.adaptive_sampler import adaptive_min_distances, pair_blocks, perigee_accel, state_table
+from app.model_a.catalog import TLE, format_merge_report, merge_catalogs, norad_id
+from app.model_a.debris_cloud import (
+    DEFAULT_MAX_BAND_KM,
+    DEFAULT_MAX_RADIUS_KM,
+    build_clouds,
+    parent_designator,
+    screen_clouds,
+)
+from app.model_a.ephemeris_cache import propagate_states, propagate_window
+from app.telemetry.metrics import REGISTRY, timed
 
 
 # Path to your static dataset
@@ -27,8 +39,16 @@ STATIC_TLE_FILES = [
     "active.tle"
 ]
 
-# TLE type
-TLE = Tuple[str, str, str]   # (name, line1, line2)
+# Metrics
+BUILD_GRAPH_SECONDS = REGISTRY.histogram(
+    "orbit_build_graph_seconds", "Wall time of Model A graph builds"
+)
+DISTANCE_EVALUATIONS = REGISTRY.counter(
+    "orbit_distance_evaluations_total", "Pairwise distance evaluations (pairs x samples)"
+)
+CLOSE_APPROACHES = REGISTRY.counter(
+    "orbit_close_approaches_total", "Close-approach edges added to conjunction graphs"
+)
 
 
 # -------------------------------------------------------
@@ -59,28 +79,172 @@ def load_tles_from_file(path: Path) -> List[TLE]:
     return tles
 
 
+def load_merged_catalog(filenames: List[str]):
+    """
+    Load several TLE files and merge them by NORAD ID (freshest epoch wins,
+    checksum failures rejected). Returns (tles, merge_report).
+    """
+    sources = {fname: load_tles_from_file(DATA_DIR / fname) for fname in filenames}
+    return merge_catalogs(sources)
+
+
 def load_all_tles() -> List[TLE]:
-    """Load and combine all TLE files."""
-    all_tles = []
-    for fname in STATIC_TLE_FILES:
-        all_tles.extend(load_tles_from_file(DATA_DIR / fname))
+    """Load and merge all TLE files."""
+    all_tles, report = load_merged_catalog(STATIC_TLE_FILES)
+    print(f"[INFO] Catalog: {format_merge_report(report)}")
     return all_tles
 
 
 # -------------------------------------------------------
 # 2) Build semantic graph using orbital propagation
 # -------------------------------------------------------
+def select_tles_by_norad(tles: List[TLE], norad_ids: Iterable) -> List[TLE]:
+    """Keep only the TLEs whose NORAD catalog number is in `norad_ids`."""
+    wanted = {str(n).strip().lstrip("0") for n in norad_ids}
+    return [t for t in tles if norad_id(t[1]).lstrip("0") in wanted]
+
+
+def _parse_satrecs(tles: List[TLE], G: nx.Graph) -> List[Tuple[str, Satrec]]:
+    """Parse TLEs into Satrec objects, adding one graph node per object."""
+    sat_objects = []
+    for name, l1, l2 in tles:
+        try:
+            sat = Satrec.twoline2rv(l1, l2)
+            sat_objects.append((name, sat))
+            G.add_node(name, tle=(l1, l2))
+        except Exception as e:
+            print(f"[ERROR] Could not parse TLE for {name}: {e}")
+    return sat_objects
+
+
+def _jday(t: datetime.datetime) -> Tuple[float, float]:
+    return jday(
+        t.year, t.month, t.day,
+        t.hour, t.minute, t.second + t.microsecond * 1e-6
+    )
+
+
+def _propagate(sat_objects: List[Tuple[str, Satrec]], time_samples) -> np.ndarray:
+    """
+    Propagate every satellite over `time_samples` ((jd, fr) pairs).
+
+    Returns an (n_sats, n_times, 3) position array in km (TEME);
+    samples where SGP4 reports an error are NaN.
+    """
+    jd = np.array([t[0] for t in time_samples])
+    fr = np.array([t[1] for t in time_samples])
+    positions, _ = propagate_states([sat for _, sat in sat_objects], jd, fr)
+    return positions
+
+
+def _propagate_window(sat_objects: List[Tuple[str, Satrec]], sample_minutes: int, step_min: int) -> np.ndarray:
+    """
+    Positions over [now, now + sample_minutes], served from the shared
+    grid of the current ephemeris refresh interval (ephemeris cache).
+    """
+    positions, _, _ = propagate_window([sat for _, sat in sat_objects], sample_minutes, step_min)
+    return positions
+
+
+def _min_distances(positions: np.ndarray, i: int, others: np.ndarray) -> np.ndarray:
+    """Minimum separation over time between object `i` and each of `others`."""
+    if len(others) == 0:
+        return np.empty(0)
+    DISTANCE_EVALUATIONS.inc(len(others) * positions.shape[1])
+    d = np.linalg.norm(positions[others] - positions[i], axis=2)
+    d = np.where(np.isnan(d), np.inf, d)
+    return d.min(axis=1)
+
+
+def _close_pairs_at(positions: np.ndarray, threshold_km: float, chunk: int = 256):
+    """
+    All pairs closer than `threshold_km` at a single time sample.
+
+    `positions` is (n_sats, 3); NaN rows never match. Rows are processed
+    in chunks so memory stays at O(chunk * n_sats).
+    Returns (i_idx, j_idx, dist) arrays with i < j.
+    """
+    n = len(positions)
+    out_i, out_j, out_d = [], [], []
+    for start in range(0, n, chunk):
+        rows = positions[start:start + chunk]
+        d = np.linalg.norm(rows[:, None, :] - positions[None, :, :], axis=2)
+        DISTANCE_EVALUATIONS.inc(d.size)
+        ii, jj = np.nonzero(d < threshold_km)
+        ii = ii + start
+        keep = ii < jj
+        out_i.append(ii[keep])
+        out_j.append(jj[keep])
+        out_d.append(d[ii[keep] - start, jj[keep]])
+    if not out_i:
+        return np.empty(0, int), np.empty(0, int), np.empty(0)
+    return np.concatenate(out_i), np.concatenate(out_j), np.concatenate(out_d)
+
+
+def _add_close_edges(G, names, i, others, min_dists, close_threshold_km):
+    for j, min_dist in zip(others, min_dists):
+        if min_dist < close_threshold_km and names[i] != names[j]:
+            G.add_edge(names[i], names[j], min_distance_km=float(min_dist))
+            CLOSE_APPROACHES.inc()
+
+
+def _screen_all_pairs(G, names, positions, close_threshold_km):
+    """Pairwise distance detection over every i < j pair."""
+    n = len(names)
+    for i in range(n):
+        others = np.arange(i + 1, n)
+        min_dists = _min_distances(positions, i, others)
+        _add_close_edges(G, names, i, others, min_dists, close_threshold_km)
+
+
+def _propagate_states_window(sat_objects: List[Tuple[str, Satrec]], sample_minutes: int, base_step_s: float):
+    """
+    State table (positions, velocities) and perigee acceleration bounds on
+    a fine `base_step_s` grid (ephemeris cache), as used by adaptive
+    screening. The table is built once and shared by every pair block.
+    """
+    sats = [sat for _, sat in sat_objects]
+    r, v, _ = propagate_window(sats, sample_minutes, base_step_s / 60.0)
+    return state_table(r, v), perigee_accel(sats)
+
+
+def _screen_adaptive(G, names, states, rows, base_step_s, close_threshold_km):
+    """
+    Screen pairs (i in `rows`, j > i) with per-pair adaptive stepping;
+    see app/model_a/adaptive_sampler.py.
+    """
+    table, accel = states
+    for I, J in pair_blocks(rows, len(names)):
+        min_d, tca_s, evaluations = adaptive_min_distances(
+            table, accel, I, J, base_step_s, close_threshold_km
+        )
+        DISTANCE_EVALUATIONS.inc(evaluations)
+        for p in np.nonzero(min_d < close_threshold_km)[0]:
+            i, j = I[p], J[p]
+            if names[i] != names[j]:
+                G.add_edge(names[i], names[j], min_distance_km=float(min_d[p]),
+                           tca_offset_s=float(tca_s[p]))
+                CLOSE_APPROACHES.inc()
+
+
+@timed(BUILD_GRAPH_SECONDS, mode="all_vs_all")
 def build_graph_from_tles(
     tles: List[TLE],
     sample_minutes: int = 120,
     step_min: int = 10,
-    close_threshold_km: float = 10.0
+    close_threshold_km: float = 10.0,
+    adaptive: bool = False,
+    base_step_s: float = 30.0,
 ) -> nx.Graph:
     """
     Build a semantic graph:
 
     - Nodes: satellite names
     - Edges: satellites that come within `close_threshold_km` distance
+
+    With `adaptive=True`, each pair is stepped by its own safe step
+    (relative velocity and separation) on a `base_step_s` grid instead of
+    the uniform `step_min` grid; edges then also carry `tca_offset_s`.
     """
 
     G = nx.Graph()
@@ -88,68 +252,144 @@ def build_graph_from_tles(
         print("[WARN] No TLE data found.")
         return G
 
-    # Parse Satrec objects
-    sat_objects = []
-    for name, l1, l2 in tles:
-        try:
-            sat = Satrec.twoline2rv(l1, l2)
-            sat_objects.append((name, sat))
-            G.add_node(name, tle=(l1, l2))
-        except Exception as e:
-            print(f"[ERROR] Could not parse TLE for {name}: {e}")
+    sat_objects = _parse_satrecs(tles, G)
+    names = [name for name, _ in sat_objects]
 
-    # Sample times for propagation
-    now = datetime.datetime.utcnow()
-    time_samples = []
-    for m in range(0, sample_minutes + 1, step_min):
-        t = now + datetime.timedelta(minutes=m)
-        jd, fr = jday(
-            t.year, t.month, t.day,
-            t.hour, t.minute, t.second + t.microsecond * 1e-6
-        )
-        time_samples.append((jd, fr))
+    if adaptive:
+        states = _propagate_states_window(sat_objects, sample_minutes, base_step_s)
+        _screen_adaptive(G, names, states, range(len(names)), base_step_s, close_threshold_km)
+        return G
+
+    positions = _propagate_window(sat_objects, sample_minutes, step_min)
+    _screen_all_pairs(G, names, positions, close_threshold_km)
 
-    # Compute positions
-    positions = {name: [] for name, _ in sat_objects}
+    return G
 
-    for name, sat in sat_objects:
-        for jd, fr in time_samples:
-            e, r, v = sat.sgp4(jd, fr)
-            if e != 0:
-                positions[name].append(None)
-            else:
-                positions[name].append(np.array(r, dtype=float))
 
-    # Pairwise distance detection
+@timed(BUILD_GRAPH_SECONDS, mode="one_vs_many")
+def build_graph_one_vs_many(
+    primary_tles: List[TLE],
+    secondary_tles: List[TLE],
+    sample_minutes: int = 120,
+    step_min: int = 10,
+    close_threshold_km: float = 10.0,
+    adaptive: bool = False,
+    base_step_s: float = 30.0,
+) -> nx.Graph:
+    """
+    Screen a primary set (e.g. an operator's fleet) against a secondary
+    catalog. Only primary x secondary pairs (and primary x primary pairs)
+    are evaluated, so the work is O(P*N) instead of O(N^2).
+
+    Objects present in both sets are screened once, as primaries.
+    The returned graph has the same shape as `build_graph_from_tles`,
+    with an extra `primary` flag on each node; `adaptive` works as there.
+    """
+
+    G = nx.Graph()
+    if not primary_tles:
+        print("[WARN] No primary TLE data found.")
+        return G
+
+    primary_ids = {norad_id(l1) for _, l1, _ in primary_tles}
+    secondary_tles = [
+        t for t in secondary_tles if norad_id(t[1]) not in primary_ids
+    ]
+
+    primaries = _parse_satrecs(primary_tles, G)
+    secondaries = _parse_satrecs(secondary_tles, G)
+    for name, _ in primaries:
+        G.nodes[name]["primary"] = True
+    for name, _ in secondaries:
+        G.nodes[name]["primary"] = False
+
+    sat_objects = primaries + secondaries
     names = [name for name, _ in sat_objects]
     n = len(names)
 
-    for i in range(n):
-        for j in range(i + 1, n):
-            min_dist = float("inf")
+    if adaptive:
+        states = _propagate_states_window(sat_objects, sample_minutes, base_step_s)
+        _screen_adaptive(G, names, states, range(len(primaries)), base_step_s, close_threshold_km)
+        return G
+
+    positions = _propagate_window(sat_objects, sample_minutes, step_min)
+
+    for i in range(len(primaries)):
+        others = np.arange(i + 1, n)
+        min_dists = _min_distances(positions, i, others)
+        _add_close_edges(G, names, i, others, min_dists, close_threshold_km)
+
+    return G
+
+
+@timed(BUILD_GRAPH_SECONDS, mode="cloud")
+def build_graph_cloud_vs_targets(
+    cloud_tles: List[TLE],
+    target_tles: List[TLE],
+    sample_minutes: int = 120,
+    step_min: int = 10,
+    close_threshold_km: float = 10.0,
+    max_cloud_radius_km: float = DEFAULT_MAX_RADIUS_KM,
+    max_cloud_band_km: float = DEFAULT_MAX_BAND_KM,
+) -> nx.Graph:
+    """
+    Screen a fragmentation cloud (e.g. COSMOS 2251 debris) against targets
+    (e.g. a constellation). Fragments are grouped into sub-cloud envelopes
+    by parent designator and position (app/model_a/debris_cloud.py), and
+    only envelopes that come close to a target are expanded.
+
+    Target x target pairs are screened as in `build_graph_one_vs_many`;
+    fragment x fragment pairs are not screened. Edges match those of
+    `build_graph_one_vs_many(target_tles, cloud_tles)` on the same grid.
+    Nodes carry a `cloud` flag (True for fragments).
+    """
+
+    G = nx.Graph()
+    if not target_tles:
+        print("[WARN] No target TLE data found.")
+        return G
+
+    target_ids = {norad_id(l1) for _, l1, _ in target_tles}
+    cloud_tles = [t for t in cloud_tles if norad_id(t[1]) not in target_ids]
+
+    targets = _parse_satrecs(target_tles, G)
+    fragments = _parse_satrecs(cloud_tles, G)
+    for name, _ in targets:
+        G.nodes[name]["cloud"] = False
+    for name, _ in fragments:
+        G.nodes[name]["cloud"] = True
 
-            for k in range(len(time_samples)):
-                r1 = positions[names[i]][k]
-                r2 = positions[names[j]][k]
+    positions = _propagate_window(targets + fragments, sample_minutes, step_min)
+    target_pos, cloud_pos = positions[:len(targets)], positions[len(targets):]
 
-                if r1 is None or r2 is None:
-                    continue
+    names = [name for name, _ in targets]
+    for i in range(len(targets)):
+        others = np.arange(i + 1, len(targets))
+        _add_close_edges(G, names, i, others, _min_distances(target_pos, i, others), close_threshold_km)
 
-                d = float(np.linalg.norm(r1 - r2))
-                if d < min_dist:
-                    min_dist = d
+    designators = [parent_designator(G.nodes[name]["tle"][0]) for name, _ in fragments]
+    clouds = build_clouds(cloud_pos, designators, max_cloud_radius_km, max_cloud_band_km)
+    hits, evaluations = screen_clouds(clouds, cloud_pos, target_pos, close_threshold_km)
+    DISTANCE_EVALUATIONS.inc(evaluations)
 
-            if min_dist < close_threshold_km:
-                G.add_edge(names[i], names[j], min_distance_km=min_dist)
+    for f, t, min_dist in hits:
+        if fragments[f][0] != targets[t][0]:
+            G.add_edge(targets[t][0], fragments[f][0], min_distance_km=min_dist)
+            CLOSE_APPROACHES.inc()
 
+    print(f"[INFO] Cloud screen: {len(fragments)} fragments in {len(clouds)} envelopes "
+          f"vs {len(targets)} targets, {evaluations} distance evaluations")
     return G
 
 
 # -------------------------------------------------------
 # 3) Helper: Run Model A end-to-end
 # -------------------------------------------------------
-def run_orbit_intelligence():
+def run_orbit_intelligence(primary_norad_ids=None):
     tles = load_all_tles()
+    if primary_norad_ids:
+        primaries = select_tles_by_norad(tles, primary_norad_ids)
+        return build_graph_one_vs_many(primaries, tles)
     graph = build_graph_from_tles(tles)
     return graph
 
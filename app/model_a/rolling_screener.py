@@ -0,0 +1,173 @@
+# ---------------------------------------------
+# File: app/model_a/rolling_screener.py
+# ---------------------------------------------
+"""
+Model A: Rolling-horizon screener
+
+Keeps propagated states in memory and advances a rolling screening
+window. Each tick only propagates the newly exposed time slice, drops
+slices that fell behind "now", and reports how the conjunction set
+changed (new / updated / cleared), so continuous monitoring costs work
+proportional to the tick length rather than the whole horizon.
+"""
+
+import datetime
+import math
+import uuid
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+import networkx as nx
+
+from app.model_a.orbit_engine import (
+    TLE,
+    _close_pairs_at,
+    _jday,
+    _parse_satrecs,
+    _propagate,
+)
+from app.model_b.graph_analytics import altitude_from_tle
+
+Pair = Tuple[str, str]
+
+
+class RollingScreener:
+    """
+    Rolling-horizon conjunction screener.
+
+    Time samples sit on a fixed grid of `step_min` minutes. For each
+    sample we only keep the pairs closer than `close_threshold_km`, so the
+    in-memory state is the (small) set of close pairs per slice.
+    """
+
+    def __init__(
+        self,
+        tles: List[TLE],
+        horizon_minutes: int = 120,
+        step_min: int = 10,
+        close_threshold_km: float = 10.0,
+        distance_tolerance_km: float = 0.1,
+    ):
+        self.horizon = datetime.timedelta(minutes=horizon_minutes)
+        self.step = datetime.timedelta(minutes=step_min)
+        self.close_threshold_km = close_threshold_km
+        self.distance_tolerance_km = distance_tolerance_km
+        # Identifies this screener's tick sequence; ticks restart at 1 with a new session
+        self.session = uuid.uuid4().hex[:12]
+
+        self.graph = nx.Graph()
+        self.sat_objects = _parse_satrecs(tles, self.graph)
+        self.names = [name for name, _ in self.sat_objects]
+        self.altitude = {name: _mean_altitude_km(self.graph.nodes[name]["tle"][1]) for name in self.names}
+
+        # deque of (sample_time, {pair: distance_km})
+        self.slices = deque()
+        self._next_time: Optional[datetime.datetime] = None
+        self.conjunctions: Dict[Pair, dict] = {}
+        self.ticks = 0
+
+    # ---------------------------------------------------
+    # Slice management
+    # ---------------------------------------------------
+    def _screen_slice(self, t: datetime.datetime) -> Dict[Pair, float]:
+        positions = _propagate(self.sat_objects, [_jday(t)])[:, 0, :]
+        ii, jj, dd = _close_pairs_at(positions, self.close_threshold_km)
+        close = {}
+        for i, j, d in zip(ii, jj, dd):
+            pair = (self.names[i], self.names[j])
+            if pair[0] == pair[1]:
+                continue
+            if pair not in close or d < close[pair]:
+                close[pair] = float(d)
+        return close
+
+    def _rebuild_conjunctions(self) -> Dict[Pair, dict]:
+        current = {}
+        for t, close in self.slices:
+            for pair, d in close.items():
+                best = current.get(pair)
+                if best is None or d < best["min_distance_km"]:
+                    current[pair] = {"min_distance_km": d, "tca": t}
+        return current
+
+    # ---------------------------------------------------
+    # Public API
+    # ---------------------------------------------------
+    def tick(self, now: Optional[datetime.datetime] = None) -> dict:
+        """
+        Advance the window to [now, now + horizon] and return a diff:
+
+            {"session", "tick", "window_start", "window_end",
+             "propagated_slices", "new", "updated", "cleared"}
+        """
+        now = now or datetime.datetime.utcnow()
+        end = now + self.horizon
+
+        # 1) Drop expired slices
+        while self.slices and self.slices[0][0] < now:
+            self.slices.popleft()
+
+        # 2) Propagate only the newly exposed slices. If the daemon fell
+        #    behind by more than the horizon, skip ahead on the same grid.
+        if self._next_time is None:
+            self._next_time = now
+        elif self._next_time < now:
+            behind = -((self._next_time - now) // self.step)
+            self._next_time += behind * self.step
+
+        propagated = 0
+        while self._next_time <= end:
+            self.slices.append((self._next_time, self._screen_slice(self._next_time)))
+            self._next_time += self.step
+            propagated += 1
+
+        # 3) Update the conjunction set and diff it against the previous one
+        previous = self.conjunctions
+        current = self._rebuild_conjunctions()
+        self.conjunctions = current
+        self.ticks += 1
+
+        new, updated, cleared = [], [], []
+        for pair, info in current.items():
+            old = previous.get(pair)
+            if old is None:
+                new.append(self._record(pair, info))
+            elif (abs(old["min_distance_km"] - info["min_distance_km"]) > self.distance_tolerance_km
+                  or old["tca"] != info["tca"]):
+                updated.append(self._record(pair, info))
+        for pair in previous:
+            if pair not in current:
+                cleared.append({"sat1": pair[0], "sat2": pair[1]})
+
+        return {
+            "session": self.session,
+            "tick": self.ticks,
+            "window_start": now.isoformat() + "Z",
+            "window_end": end.isoformat() + "Z",
+            "propagated_slices": propagated,
+            "new": new,
+            "updated": updated,
+            "cleared": cleared,
+        }
+
+    def snapshot(self) -> List[dict]:
+        """Current conjunction set, closest first."""
+        records = [self._record(p, i) for p, i in self.conjunctions.items()]
+        return sorted(records, key=lambda r: r["minDistance"])
+
+    def _record(self, pair: Pair, info: dict) -> dict:
+        """Conjunction record; alt1/alt2 are the objects' mean altitudes (km)."""
+        return {
+            "sat1": pair[0],
+            "sat2": pair[1],
+            "minDistance": round(info["min_distance_km"], 3),
+            "tca": info["tca"].isoformat() + "Z",
+            "alt1": self.altitude[pair[0]],
+            "alt2": self.altitude[pair[1]],
+        }
+
+
+def _mean_altitude_km(l2: str) -> Optional[float]:
+    """Rounded mean altitude for JSON records (None when the TLE has no valid mean motion)."""
+    altitude = altitude_from_tle(l2)
+    return None if math.isnan(altitude) else round(altitude, 1)
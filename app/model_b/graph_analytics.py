@@ -0,0 +1,301 @@
+# -----------------------------
+# File: app/model_b/graph_analytics.py
+# -----------------------------
+"""
+Model B: Conjunction graph analytics on sparse edge arrays.
+
+Instead of networkx traversals, the conjunction graph is kept as a
+sorted edge-key array (with miss distances) plus per-object degree and
+altitude:
+- edges are upserted/removed in vectorized batches (pipeline graphs,
+  rolling monitor diffs); degree and altitude-band counts are updated
+  from the changed edges only,
+- connected components (scipy.sparse.csgraph) and k-core numbers
+  (batched peeling with sparse mat-vecs) are recomputed lazily, only
+  when the edge set changed since the last query.
+
+This stays in the milliseconds for graphs with hundreds of thousands of
+edges, where networkx's Python-level algorithms take seconds.
+"""
+import math
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import networkx as nx
+import numpy as np
+
+MU_EARTH = 398600.4418    # km^3 / s^2
+R_EARTH = 6378.137        # km
+DEFAULT_BAND_KM = 50.0
+
+
+def altitude_from_tle(l2: str) -> float:
+    """Mean altitude (km) from the mean motion of TLE line 2 (columns 53-63)."""
+    try:
+        n = float(l2[52:63]) * 2.0 * math.pi / 86400.0   # rad/s
+    except (ValueError, IndexError):
+        return float("nan")
+    if n <= 0:
+        return float("nan")
+    return (MU_EARTH / n ** 2) ** (1.0 / 3.0) - R_EARTH
+
+
+class ConjunctionAnalytics:
+    """
+    Incrementally maintained conjunction-graph statistics.
+
+    Edges live in a sorted int64 key array (i << 32 | j, i < j) with the
+    miss distance alongside, so batches of upserts/removals are a
+    searchsorted plus one insert/delete instead of per-edge Python work.
+    `window_hours` is the screening window the edges came from; it turns
+    per-object conjunction counts into rates per day.
+    """
+
+    def __init__(self, window_hours: float = 2.0, band_km: float = DEFAULT_BAND_KM):
+        self.window_hours = window_hours
+        self.band_km = band_km
+
+        self.names: List[str] = []
+        self._index: Dict[str, int] = {}
+        self.altitude = np.empty(0)
+        self.degree = np.empty(0, dtype=np.int64)
+
+        self.keys = np.empty(0, dtype=np.int64)
+        self.distance = np.empty(0)
+
+        self.band_counts: Dict[int, int] = {}
+        self._labels = None
+        self._sizes = None
+        self._cores = None
+
+    # ---------------------------------------------------
+    # Construction
+    # ---------------------------------------------------
+    @classmethod
+    def from_graph(cls, G: nx.Graph, window_hours: float = 2.0, band_km: float = DEFAULT_BAND_KM):
+        analytics = cls(window_hours, band_km)
+        for name, data in G.nodes(data=True):
+            tle = data.get("tle")
+            analytics.add_node(name, altitude_from_tle(tle[1]) if tle else None)
+        analytics.upsert_edges(
+            (u, v, d.get("min_distance_km", float("nan"))) for u, v, d in G.edges(data=True)
+        )
+        return analytics
+
+    def add_node(self, name: str, altitude_km: Optional[float] = None) -> int:
+        idx = self._index.get(name)
+        if idx is None:
+            idx = len(self.names)
+            self._index[name] = idx
+            self.names.append(name)
+            if idx >= len(self.degree):
+                grow = max(64, len(self.degree))
+                self.degree = np.concatenate([self.degree, np.zeros(grow, dtype=np.int64)])
+                self.altitude = np.concatenate([self.altitude, np.full(grow, np.nan)])
+            self._invalidate()
+        if altitude_km is not None and np.isnan(self.altitude[idx]):
+            self.altitude[idx] = altitude_km
+        return idx
+
+    def _invalidate(self):
+        self._labels = self._sizes = self._cores = None
+
+    # ---------------------------------------------------
+    # Incremental edge updates
+    # ---------------------------------------------------
+    def _pair_keys(self, pairs) -> np.ndarray:
+        idx = np.array([(self.add_node(u), self.add_node(v)) for u, v in pairs], dtype=np.int64)
+        idx = idx.reshape(-1, 2)
+        i, j = idx.min(axis=1), idx.max(axis=1)
+        keys = (i << 32) | j
+        keys[i == j] = -1   # self pairs are ignored
+        return keys
+
+    def _update_counts(self, keys: np.ndarray, delta: int):
+        i, j = keys >> 32, keys & 0xFFFFFFFF
+        np.add.at(self.degree, i, delta)
+        np.add.at(self.degree, j, delta)
+        alt = (self.altitude[i] + self.altitude[j]) / 2.0
+        bands, counts = np.unique((alt[~np.isnan(alt)] // self.band_km).astype(np.int64),
+                                  return_counts=True)
+        for band, count in zip(bands.tolist(), counts.tolist()):
+            total = self.band_counts.get(band, 0) + delta * count
+            if total > 0:
+                self.band_counts[band] = total
+            else:
+                self.band_counts.pop(band, None)
+
+    def upsert_edges(self, edges: Iterable[Tuple[str, str, float]]):
+        """Add edges (u, v, min_distance_km), or update the distance of known ones."""
+        edges = list(edges)
+        if not edges:
+            return
+        keys = self._pair_keys((u, v) for u, v, _ in edges)
+        dist = np.array([d for _, _, d in edges], dtype=float)
+
+        # Last occurrence wins within the batch
+        keys, first = np.unique(keys[::-1], return_index=True)
+        dist = dist[::-1][first]
+        keep = keys >= 0
+        keys, dist = keys[keep], dist[keep]
+
+        pos = np.searchsorted(self.keys, keys)
+        known = pos < len(self.keys)
+        known[known] = self.keys[pos[known]] == keys[known]
+        self.distance[pos[known]] = dist[known]
+
+        new = ~known
+        if new.any():
+            self.keys = np.insert(self.keys, pos[new], keys[new])
+            self.distance = np.insert(self.distance, pos[new], dist[new])
+            self._update_counts(keys[new], +1)
+            self._invalidate()
+
+    def remove_edges(self, pairs: Iterable[Tuple[str, str]]):
+        pairs = [(u, v) for u, v in pairs if u in self._index and v in self._index]
+        if not pairs:
+            return
+        keys = np.unique(self._pair_keys(pairs))
+        pos = np.searchsorted(self.keys, keys)
+        found = pos < len(self.keys)
+        found[found] = self.keys[pos[found]] == keys[found]
+        if found.any():
+            self._update_counts(keys[found], -1)
+            self.keys = np.delete(self.keys, pos[found])
+            self.distance = np.delete(self.distance, pos[found])
+            self._invalidate()
+
+    def upsert_records(self, records: Iterable[dict]):
+        """
+        Upsert RollingScreener conjunction records (sat1, sat2, minDistance);
+        their alt1/alt2 mean altitudes place the objects in altitude bands.
+        """
+        records = list(records)
+        for r in records:
+            self.add_node(r["sat1"], r.get("alt1"))
+            self.add_node(r["sat2"], r.get("alt2"))
+        self.upsert_edges((r["sat1"], r["sat2"], r.get("minDistance", float("nan"))) for r in records)
+
+    def apply_diff(self, diff: dict):
+        """Apply a RollingScreener tick diff (new / updated / cleared records)."""
+        self.upsert_records(diff.get("new", []) + diff.get("updated", []))
+        self.remove_edges((r["sat1"], r["sat2"]) for r in diff.get("cleared", []))
+
+    # ---------------------------------------------------
+    # Lazily recomputed structure
+    # ---------------------------------------------------
+    @property
+    def n_nodes(self) -> int:
+        return len(self.names)
+
+    @property
+    def n_edges(self) -> int:
+        return len(self.keys)
+
+    def adjacency(self):
+        """Symmetric CSR adjacency matrix of the live edges."""
+        # scipy.sparse is imported on first use: it adds ~0.25 s to API start-up
+        from scipy.sparse import coo_matrix
+
+        src, dst = self.keys >> 32, self.keys & 0xFFFFFFFF
+        rows = np.concatenate([src, dst])
+        cols = np.concatenate([dst, src])
+        data = np.ones(len(rows), dtype=np.int32)
+        return coo_matrix((data, (rows, cols)), shape=(self.n_nodes, self.n_nodes)).tocsr()
+
+    def components(self) -> np.ndarray:
+        """Connected-component label per object."""
+        if self._labels is None:
+            from scipy.sparse.csgraph import connected_components
+
+            _, self._labels = connected_components(self.adjacency(), directed=False)
+            self._sizes = np.bincount(self._labels) if self.n_nodes else np.zeros(0, dtype=np.int64)
+        return self._labels
+
+    def component_sizes(self) -> np.ndarray:
+        """Size of each component, indexed by label."""
+        self.components()
+        return self._sizes
+
+    def core_numbers(self) -> np.ndarray:
+        """k-core number per object (batched peeling; one sparse mat-vec per round)."""
+        if self._cores is not None:
+            return self._cores
+        A = self.adjacency()
+        deg = self.degree[:self.n_nodes].copy()
+        core = np.zeros(self.n_nodes, dtype=np.int64)
+        alive = np.ones(self.n_nodes, dtype=bool)
+        k = 0
+        while alive.any():
+            k = max(k, int(deg[alive].min()))
+            while True:
+                peel = alive & (deg <= k)
+                if not peel.any():
+                    break
+                core[peel] = k
+                alive[peel] = False
+                deg -= A @ peel.astype(np.int64)
+        self._cores = core
+        return core
+
+    # ---------------------------------------------------
+    # Report
+    # ---------------------------------------------------
+    def summary(self, top: int = 10) -> dict:
+        n = self.n_nodes
+        degree = self.degree[:n]
+        altitude = self.altitude[:n]
+        labels = self.components()
+        sizes = self.component_sizes()
+        cores = self.core_numbers()
+        window_days = self.window_hours / 24.0
+
+        clusters = np.sort(sizes[sizes > 1])[::-1]
+        max_core = int(cores.max()) if n else 0
+
+        ranked = np.argsort(-degree, kind="stable")[:top]
+        top_objects = [
+            {
+                "object": self.names[i],
+                "conjunctions": int(degree[i]),
+                "rate_per_day": round(float(degree[i] / window_days), 3),
+                "core": int(cores[i]),
+                "component_size": int(sizes[labels[i]]),
+                "altitude_km": None if np.isnan(altitude[i]) else round(float(altitude[i]), 1),
+            }
+            for i in ranked if degree[i] > 0
+        ]
+
+        involved = (degree > 0) & ~np.isnan(altitude)
+        object_bands = np.bincount((altitude[involved] // self.band_km).astype(np.int64)) \
+            if involved.any() else np.zeros(0, dtype=np.int64)
+        bands = sorted(self.band_counts.items(), key=lambda kv: -kv[1])[:top]
+        altitude_bands = [
+            {
+                "band_km": [band * self.band_km, (band + 1) * self.band_km],
+                "conjunctions": count,
+                "objects": int(object_bands[band]) if 0 <= band < len(object_bands) else 0,
+            }
+            for band, count in bands
+        ]
+
+        return {
+            "nodes": n,
+            "edges": self.n_edges,
+            "window_hours": self.window_hours,
+            "components": {"clusters": int(len(clusters)), "largest": clusters[:5].tolist()},
+            "max_core": max_core,
+            "core_members": [self.names[i] for i in np.nonzero(cores == max_core)[0][:top]] if max_core else [],
+            "top_objects": top_objects,
+            "altitude_bands": altitude_bands,
+        }
+
+    def object_context(self, name: str) -> Optional[dict]:
+        """Cluster context of one object (for edge explanations)."""
+        i = self._index.get(name)
+        if i is None:
+            return None
+        return {
+            "conjunctions": int(self.degree[i]),
+            "core": int(self.core_numbers()[i]),
+            "component_size": int(self.component_sizes()[self.components()[i]]),
+        }
@@ -10,7 +10,15 @@ Model B: Collision Risk Predictor (heuristic placeholder)
 import networkx as nx
 import numpy as np
 
+from app.telemetry.metrics import REGISTRY, timed
 
+RISK_SCORING_SECONDS = REGISTRY.histogram(
+    "risk_scoring_seconds", "Wall time of Model B heuristic scoring"
+)
+EDGES_SCORED = REGISTRY.counter("risk_edges_scored_total", "Edges scored by Model B")
+
+
+@timed(RISK_SCORING_SECONDS)
 def heuristic_risk_scores(G: nx.Graph):
     scores = {}
     for u, v, data in G.edges(data=True):
@@ -23,15 +31,29 @@ def heuristic_risk_scores(G: nx.Graph):
             score = float(np.clip(raw, 0.0, 1.0))
         scores[(u, v)] = score
         G.edges[u, v]['risk_score'] = score
+    EDGES_SCORED.inc(len(scores))
     return scores
 
 
-def explain_edge(u: str, v: str, G: nx.Graph) -> str:
+def explain_edge(u: str, v: str, G: nx.Graph, analytics=None) -> str:
+    """
+    Short explanation of one edge. With a ConjunctionAnalytics instance
+    (app.model_b.graph_analytics) the clustering note uses the k-core and
+    cluster size instead of raw node degree.
+    """
     d = G.edges[u, v].get('min_distance_km', None)
     s = G.edges[u, v].get('risk_score', None)
     if d is None or s is None:
         return f"No detailed data for {u} - {v}."
     explanation = f"Satellites {u} and {v}: min distance ~ {d:.1f} km → risk score {s:.2f}."
+    if analytics is not None:
+        ctx_u, ctx_v = analytics.object_context(u), analytics.object_context(v)
+        if ctx_u and ctx_v:
+            core = max(ctx_u["core"], ctx_v["core"])
+            if core > 1:
+                explanation += (f" Part of a {ctx_u['component_size']}-object conjunction cluster"
+                                f" ({core}-core) increases clustering risk.")
+            return explanation
     if (G.degree(u) > 2 or G.degree(v) > 2):
         explanation += " High node degree increases conjunction clustering risk."
     return explanation
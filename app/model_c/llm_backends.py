@@ -0,0 +1,271 @@
+# -----------------------------
+# File: app/model_c/llm_backends.py
+# -----------------------------
+"""
+Pluggable LLM backends shared by Model C (negotiation) and Model D (report).
+
+LLM_BACKEND selects the backend behind generate():
+    gemini     live Gemini API (default)
+    record     live Gemini; every response is also saved to LLM_RECORD_DIR
+    replay     responses saved by `record`, no network
+    synthetic  generated responses, no network
+
+The offline backends sleep for a latency drawn from LLM_LATENCY:
+    none | fixed:<ms> | uniform:<lo_ms>:<hi_ms> | lognormal:<median_ms>:<sigma>
+    | recorded (replay only: the latency measured while recording)
+Draws use LLM_SEED, and synthetic text depends only on the prompt, so
+offline runs are reproducible. LLM_REPLAY_MISS=error|any decides what
+replay does with a prompt that was never recorded: fail, or reuse one of
+that model's recordings (picked deterministically from the prompt).
+"""
+import contextlib
+import hashlib
+import json
+import math
+import os
+import random
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from dotenv import load_dotenv
+
+from app.telemetry.metrics import REGISTRY
+
+load_dotenv()
+
+LLM_CALL_SECONDS = REGISTRY.histogram("llm_call_seconds", "Latency of LLM calls")
+LLM_CALLS = REGISTRY.counter("llm_calls_total", "LLM calls by model, backend and outcome")
+
+DEFAULT_RECORD_DIR = "llm_recordings"
+
+
+class LLMUnavailable(RuntimeError):
+    """The backend cannot answer at all (no API key, nothing recorded)."""
+
+
+# -------------------------------------------------------
+# 1) Latency distributions
+# -------------------------------------------------------
+def parse_latency(spec: str) -> Callable[[random.Random, Optional[float]], float]:
+    """
+    Turn an LLM_LATENCY spec into a sampler (rng, recorded_s) -> seconds.
+    """
+    kind, *args = (spec or "none").split(":")
+    values = [float(a) for a in args if kind != "recorded"]
+    if kind == "none":
+        return lambda rng, recorded: 0.0
+    if kind == "fixed" and len(values) == 1:
+        return lambda rng, recorded: values[0] / 1000.0
+    if kind == "uniform" and len(values) == 2:
+        return lambda rng, recorded: rng.uniform(values[0], values[1]) / 1000.0
+    if kind == "lognormal" and len(values) == 2:
+        mu = math.log(values[0] / 1000.0)
+        return lambda rng, recorded: rng.lognormvariate(mu, values[1])
+    if kind == "recorded":
+        return lambda rng, recorded: recorded or 0.0
+    raise ValueError(f"Invalid LLM_LATENCY spec: {spec!r}")
+
+
+# -------------------------------------------------------
+# 2) Backends
+# -------------------------------------------------------
+class GeminiBackend:
+    """Live Gemini API via google.genai (imported on first call)."""
+
+    name = "gemini"
+
+    def __init__(self):
+        self._client = None
+        self._lock = threading.Lock()
+
+    def _get_client(self):
+        with self._lock:
+            if self._client is None:
+                api_key = os.getenv("GEMINI_API_KEY")
+                if not api_key:
+                    raise LLMUnavailable("GEMINI_API_KEY not found in environment.")
+                from google import genai
+                self._client = genai.Client(api_key=api_key)
+            return self._client
+
+    def generate(self, prompt: str, model: str, max_tokens: int) -> str:
+        client = self._get_client()
+        from google.genai import types
+
+        response = client.models.generate_content(
+            model=model,
+            contents=prompt,
+            config=types.GenerateContentConfig(max_output_tokens=max_tokens),
+        )
+        return response.text
+
+
+def _prompt_key(prompt: str, model: str) -> str:
+    return hashlib.sha256(f"{model}\n{prompt}".encode("utf-8")).hexdigest()
+
+
+class RecordingBackend:
+    """Wraps a live backend and saves every response (with its latency) to disk."""
+
+    name = "record"
+
+    def __init__(self, inner, record_dir: Path):
+        self.inner = inner
+        self.record_dir = Path(record_dir)
+
+    def generate(self, prompt: str, model: str, max_tokens: int) -> str:
+        started = time.perf_counter()
+        text = self.inner.generate(prompt, model, max_tokens)
+        latency = time.perf_counter() - started
+
+        self.record_dir.mkdir(parents=True, exist_ok=True)
+        key = _prompt_key(prompt, model)
+        path = self.record_dir / f"{key}.json"
+        tmp = path.with_name(f"{key}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"model": model, "prompt": prompt, "response": text, "latency_s": latency}, f)
+        os.replace(tmp, path)
+        return text
+
+
+class _LatencyMixin:
+    def _init_latency(self, latency: str, seed: int):
+        self._sample_latency = parse_latency(latency)
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+
+    def _sleep(self, recorded: Optional[float] = None):
+        with self._rng_lock:
+            delay = self._sample_latency(self._rng, recorded)
+        if delay > 0:
+            time.sleep(delay)
+
+
+class ReplayBackend(_LatencyMixin):
+    """Serves responses saved by RecordingBackend; never touches the network."""
+
+    name = "replay"
+
+    def __init__(self, record_dir: Path, latency: str = "recorded", seed: int = 0, miss: str = "error"):
+        self.record_dir = Path(record_dir)
+        self.miss = miss
+        self._by_model: Optional[Dict[str, List[Path]]] = None
+        self._init_latency(latency, seed)
+
+    def _recordings(self, model: str) -> List[Path]:
+        if self._by_model is None:
+            by_model: Dict[str, List[Path]] = {}
+            for path in sorted(self.record_dir.glob("*.json")):
+                with open(path, encoding="utf-8") as f:
+                    by_model.setdefault(json.load(f)["model"], []).append(path)
+            self._by_model = by_model
+        return self._by_model.get(model, [])
+
+    def generate(self, prompt: str, model: str, max_tokens: int) -> str:
+        key = _prompt_key(prompt, model)
+        path = self.record_dir / f"{key}.json"
+        if not path.exists():
+            candidates = self._recordings(model) if self.miss == "any" else []
+            if not candidates:
+                raise LLMUnavailable(f"No recorded response for this {model} prompt in {self.record_dir}")
+            path = candidates[int(key, 16) % len(candidates)]
+
+        with open(path, encoding="utf-8") as f:
+            record = json.load(f)
+        self._sleep(record.get("latency_s"))
+        return record["response"]
+
+
+_SYNTHETIC_ACTIONS = ["Raise", "Lower"]
+_SYNTHETIC_WORDS = (
+    "orbit maneuver delta-v burn window margin covariance screening phasing "
+    "along-track radial separation conjunction fuel safety attitude thruster"
+).split()
+
+
+class SyntheticBackend(_LatencyMixin):
+    """
+    Deterministic offline responses shaped like the real ones: critique
+    prompts get a CONFIDENCE first line, everything else a few short lines.
+    """
+
+    name = "synthetic"
+
+    def __init__(self, latency: str = "none", seed: int = 0, words: int = 40):
+        self.words = words
+        self._init_latency(latency, seed)
+
+    def generate(self, prompt: str, model: str, max_tokens: int) -> str:
+        self._sleep()
+        rng = random.Random(_prompt_key(prompt, model))
+        lines = []
+        if "CONFIDENCE" in prompt:
+            lines.append(f"CONFIDENCE: {rng.randint(55, 95)}")
+        lines.append(f"{rng.choice(_SYNTHETIC_ACTIONS)} orbit of the first satellite by "
+                     f"{rng.choice([0.2, 0.5, 1.0, 2.0])} km.")
+        n_words = min(self.words, max(1, max_tokens // 2))
+        lines.append(" ".join(rng.choice(_SYNTHETIC_WORDS) for _ in range(n_words)) + ".")
+        return "\n".join(lines)
+
+
+# -------------------------------------------------------
+# 3) Selection and entry point
+# -------------------------------------------------------
+_BACKEND = None
+_BACKEND_LOCK = threading.Lock()
+
+
+def backend_from_env():
+    kind = os.getenv("LLM_BACKEND", "gemini").lower()
+    record_dir = Path(os.getenv("LLM_RECORD_DIR", DEFAULT_RECORD_DIR))
+    seed = int(os.getenv("LLM_SEED", "0"))
+    if kind == "gemini":
+        return GeminiBackend()
+    if kind == "record":
+        return RecordingBackend(GeminiBackend(), record_dir)
+    if kind == "replay":
+        return ReplayBackend(record_dir, os.getenv("LLM_LATENCY", "recorded"), seed,
+                             os.getenv("LLM_REPLAY_MISS", "error"))
+    if kind == "synthetic":
+        return SyntheticBackend(os.getenv("LLM_LATENCY", "none"), seed)
+    raise ValueError(f"Unknown LLM_BACKEND: {kind!r}")
+
+
+def get_backend():
+    """The process-wide backend, built from the environment on first use."""
+    global _BACKEND
+    with _BACKEND_LOCK:
+        if _BACKEND is None:
+            _BACKEND = backend_from_env()
+        return _BACKEND
+
+
+@contextlib.contextmanager
+def use_backend(backend):
+    """Temporarily replace the process-wide backend (benchmarks, tests)."""
+    global _BACKEND
+    with _BACKEND_LOCK:
+        saved, _BACKEND = _BACKEND, backend
+    try:
+        yield backend
+    finally:
+        with _BACKEND_LOCK:
+            _BACKEND = saved
+
+
+def generate(prompt: str, model: str, max_tokens: int = 1024) -> str:
+    """Generate text with the configured backend; raises on failure."""
+    backend = get_backend()
+    try:
+        with LLM_CALL_SECONDS.time(model=model, backend=backend.name):
+            text = backend.generate(prompt, model, max_tokens)
+    except LLMUnavailable:
+        LLM_CALLS.inc(model=model, backend=backend.name, status="unavailable")
+        raise
+    except Exception:
+        LLM_CALLS.inc(model=model, backend=backend.name, status="error")
+        raise
+    LLM_CALLS.inc(model=model, backend=backend.name, status="ok")
+    return text
@@ -1,5 +1,4 @@
 
-import os
 import mimetypes
 from dotenv import load_dotenv
 
@@ -10,30 +9,20 @@ if not mimetypes.inited:
 
 load_dotenv()
 
-from google import genai
-
-API_KEY = os.getenv("GEMINI_API_KEY")
+from app.model_c import llm_backends
+from app.model_c.llm_backends import LLMUnavailable
 
 
 def call_adk_model(prompt: str, model: str = "gemini-2.5-flash", max_tokens: int = 1024) -> str:
     """
-    Wrapper around the Google Generative AI API.
+    Generate text with the configured LLM backend (LLM_BACKEND, default
+    the live Gemini API; see llm_backends). Returns an error string
+    instead of raising.
     """
-    if not API_KEY:
-        return "ERROR: GEMINI_API_KEY not found in environment."
-
     try:
-        client = genai.Client(api_key=API_KEY)
-        
-        # Generate content
-        response = client.models.generate_content(
-            model=model,
-            contents=prompt,
-            config=genai.types.GenerateContentConfig(
-                max_output_tokens=max_tokens
-            )
-        )
-        return response.text
+        return llm_backends.generate(prompt, model=model, max_tokens=max_tokens)
+    except LLMUnavailable as e:
+        return f"ERROR: {e}"
     except Exception as e:
         return f"GEMINI_CALL_ERROR: {e}"
 
@@ -0,0 +1,193 @@
+# -----------------------------
+# File: app/model_d/prompt_builder.py
+# -----------------------------
+"""
+Model D: bounded prompt construction for large risk datasets.
+
+Instead of interpolating every edge dict into the prompt, the context is
+made of:
+  1. aggregate statistics over all conjunctions,
+  2. compact detail lines for the top-k riskiest ones,
+  3. for very large runs, LLM summaries of the next-riskiest conjunctions
+     (map-reduce over chunks, in parallel, capped at MAX_CHUNKS).
+
+Every part is trimmed to a token budget, so prompt size and token cost
+stay roughly constant as the catalog grows.
+"""
+import math
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional
+
+DEFAULT_TOKEN_BUDGET = 1500     # final context handed to each section prompt
+TOP_K_DETAIL = 10
+CHUNK_TOKEN_BUDGET = 1200       # size of one map-phase chunk
+MAX_CHUNKS = 8                  # caps map-phase cost for huge runs
+SUMMARY_WORDS = 60
+FIELD_CHARS = 160
+
+DISTANCE_BINS_KM = [1.0, 5.0, 10.0, 20.0]
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate (~4 characters per token)."""
+    return math.ceil(len(text) / 4)
+
+
+def _truncate(text, limit=FIELD_CHARS) -> str:
+    text = " ".join(str(text or "").split())
+    return text if len(text) <= limit else text[: limit - 3] + "..."
+
+
+def _trim_to_budget(text: str, token_budget: int) -> str:
+    max_chars = token_budget * 4
+    return text if len(text) <= max_chars else text[: max_chars - 3] + "..."
+
+
+def _percentile(sorted_values, q):
+    if not sorted_values:
+        return None
+    idx = min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+# -------------------------------------------------------
+# 1) Statistics over all conjunctions
+# -------------------------------------------------------
+def summarize_conjunctions(risk_data) -> str:
+    """Aggregate the whole conjunction set into a few lines of statistics."""
+    n = len(risk_data)
+    if n == 0:
+        return "No close approaches were detected."
+
+    distances = sorted(r.get("minDistance", 0.0) for r in risk_data)
+    risks = sorted(r.get("riskScore", 0.0) for r in risk_data)
+
+    high = sum(1 for r in risks if r > 0.7)
+    medium = sum(1 for r in risks if 0.4 < r <= 0.7)
+
+    bins = [0] * (len(DISTANCE_BINS_KM) + 1)
+    for d in distances:
+        bins[sum(1 for edge in DISTANCE_BINS_KM if d >= edge)] += 1
+    labels = [f"<{DISTANCE_BINS_KM[0]:g}"]
+    labels += [f"{a:g}-{b:g}" for a, b in zip(DISTANCE_BINS_KM, DISTANCE_BINS_KM[1:])]
+    labels += [f">={DISTANCE_BINS_KM[-1]:g}"]
+
+    degree = {}
+    for r in risk_data:
+        for sat in (r.get("sat1"), r.get("sat2")):
+            degree[sat] = degree.get(sat, 0) + 1
+    busiest = sorted(degree.items(), key=lambda kv: -kv[1])[:5]
+
+    return "\n".join([
+        f"Conjunctions: {n} among {len(degree)} objects "
+        f"({high} high, {medium} medium, {n - high - medium} low risk).",
+        f"Miss distance km: min {distances[0]:.2f}, p10 {_percentile(distances, 0.1):.2f}, "
+        f"median {_percentile(distances, 0.5):.2f}, max {distances[-1]:.2f}.",
+        f"Risk score: mean {sum(risks) / n:.3f}, p90 {_percentile(risks, 0.9):.3f}, max {risks[-1]:.3f}.",
+        "Miss distance histogram (km): " + ", ".join(f"{l}: {c}" for l, c in zip(labels, bins)) + ".",
+        "Most conjunctions: " + ", ".join(f"{s} ({c})" for s, c in busiest) + ".",
+    ])
+
+
+# -------------------------------------------------------
+# 2) Compact per-conjunction detail
+# -------------------------------------------------------
+def detail_line(r) -> str:
+    line = (f"{r.get('sat1')} <-> {r.get('sat2')} | {r.get('minDistance', 0.0):.2f} km"
+            f" | risk {r.get('riskScore', 0.0):.3f}")
+    if r.get("maneuver"):
+        line += f" | maneuver: {_truncate(r['maneuver'])}"
+    return line
+
+
+def _chunk_lines(lines: List[str], token_budget: int) -> List[List[str]]:
+    chunks, current, used = [], [], 0
+    for line in lines:
+        cost = estimate_tokens(line) + 1
+        if current and used + cost > token_budget:
+            chunks.append(current)
+            current, used = [], 0
+        current.append(line)
+        used += cost
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+# -------------------------------------------------------
+# 3) Map-reduce over the tail
+# -------------------------------------------------------
+def _map_prompt(lines: List[str]) -> str:
+    joined = "\n".join(lines)
+    return f"""
+    Summarize these satellite conjunctions in at most {SUMMARY_WORDS} words.
+    Mention recurring objects, the closest approaches and common maneuver themes.
+
+    {joined}
+    """
+
+
+def map_reduce_summaries(lines: List[str], llm_fn: Callable[[str], str],
+                         chunk_token_budget=CHUNK_TOKEN_BUDGET, max_chunks=MAX_CHUNKS):
+    """
+    Summarize `lines` (already sorted riskiest first) chunk by chunk in
+    parallel. Chunks past `max_chunks` are dropped, so the cost is bounded.
+    Returns (summaries, number of lines covered).
+    """
+    chunks = _chunk_lines(lines, chunk_token_budget)[:max_chunks]
+    if not chunks:
+        return [], 0
+
+    def summarize(chunk):
+        try:
+            return _truncate(llm_fn(_map_prompt(chunk)), SUMMARY_WORDS * 8)
+        except Exception as e:
+            print(f"⚠️ Chunk summary failed: {e}")
+            return ""
+
+    with ThreadPoolExecutor(max_workers=len(chunks)) as pool:
+        summaries = [s for s in pool.map(summarize, chunks) if s]
+    return summaries, sum(len(c) for c in chunks)
+
+
+# -------------------------------------------------------
+# 4) Context builder
+# -------------------------------------------------------
+def build_context(risk_data, llm_fn: Optional[Callable[[str], str]] = None,
+                  token_budget=DEFAULT_TOKEN_BUDGET, top_k=TOP_K_DETAIL) -> str:
+    """
+    Build a prompt context for `risk_data` that fits `token_budget`.
+
+    Small runs get every conjunction as a detail line. Larger runs get the
+    statistics plus the top-k; when `llm_fn` is given, the remaining
+    conjunctions are condensed via map_reduce_summaries.
+    """
+    ranked = sorted(risk_data, key=lambda r: r.get("riskScore", 0.0), reverse=True)
+    stats = summarize_conjunctions(ranked)
+    lines = [detail_line(r) for r in ranked]
+
+    full = stats + "\n\nConjunctions:\n" + "\n".join(lines)
+    if estimate_tokens(full) <= token_budget:
+        return full
+
+    # Statistics always fit; top-k detail gets up to half the budget
+    remaining = token_budget - estimate_tokens(stats)
+    top_lines = []
+    used = 0
+    for line in lines[:top_k]:
+        cost = estimate_tokens(line) + 1
+        if used + cost > remaining // 2:
+            break
+        top_lines.append(line)
+        used += cost
+
+    parts = [stats, f"\nTop {len(top_lines)} conjunctions by risk:", *top_lines]
+
+    tail = lines[len(top_lines):]
+    if llm_fn is not None and tail and remaining - used > 0:
+        summaries, covered = map_reduce_summaries(tail, llm_fn)
+        if summaries:
+            parts.append(f"\nSummary of the next {covered} of {len(tail)} remaining conjunctions:")
+            parts.append(_trim_to_budget("\n".join(summaries), remaining - used))
+
+    return _trim_to_budget("\n".join(parts), token_budget)
@@ -1,14 +1,23 @@
 import os
+import asyncio
 import datetime
+import hashlib
+import json
 import mimetypes
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from xml.sax.saxutils import escape
 from dotenv import load_dotenv
-import google.generativeai as genai
 
-# ReportLab imports for PDF generation
-from reportlab.lib.pagesizes import letter
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-from reportlab.lib.units import inch
+from app.model_c import llm_backends
+from app.model_d.prompt_builder import build_context
+from app.telemetry.metrics import REGISTRY, timed
+
+REPORT_SECONDS = REGISTRY.histogram(
+    "report_generation_seconds", "Wall time of Model D report generation"
+)
+REPORTS = REGISTRY.counter("reports_generated_total", "Mission reports by outcome")
 
 # FIX for Python 3.12 Windows registry issue
 if not mimetypes.inited:
@@ -16,49 +25,264 @@ if not mimetypes.inited:
     mimetypes.add_type("image/webp", ".webp")
 
 load_dotenv()
-genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
 
-def generate_llm_mission_report(risk_data, out_pdf_path="collision_report.pdf"):
-    """
-    Generates a mission report using AI and saves it directly to a PDF file.
-    Returns: (html_path, pdf_path)
-    """
-    prompt = f"""
+REPORT_MODEL = "gemini-1.5-flash"
+REPORT_CACHE_DIR = Path(os.getenv("REPORT_CACHE_DIR", "reports"))
+REPORT_CACHE_MAX_BYTES = int(float(os.getenv("REPORT_CACHE_MAX_MB", "200")) * 2 ** 20)
+TOP_K_CONJUNCTIONS = 10
+
+# Narrative sections are the only parts written by the LLM; everything
+# else in the report is rendered directly from the data.
+NARRATIVE_SECTIONS = {
+    "Executive Summary": "Write a 4-6 sentence executive summary of the conjunction screening results.",
+    "Recommended Maneuvers": "Recommend avoidance maneuvers for the highest-risk encounters, one short bullet each.",
+    "Safety Notes": "List 3-5 short operational safety notes for the flight dynamics team.",
+}
+
+# ReportLab is heavy and imported on first render; LLM calls go through
+# the pluggable backends of app/model_c/llm_backends.py (LLM_BACKEND).
+
+
+# -------------------------------------------------------
+# 1) Deterministic report data (no LLM)
+# -------------------------------------------------------
+def build_report_data(risk_data, top_k=TOP_K_CONJUNCTIONS):
+    """Aggregate edge dicts into the stats and tables rendered in the report."""
+    risks = [r.get("riskScore", 0.0) for r in risk_data]
+    distances = [r.get("minDistance", 0.0) for r in risk_data]
+
+    severity = {"high": 0, "medium": 0, "low": 0}
+    for r in risk_data:
+        severity[_severity(r.get("riskScore", 0.0))] += 1
+
+    per_object = {}
+    for r in risk_data:
+        for sat in (r.get("sat1"), r.get("sat2")):
+            stats = per_object.setdefault(sat, {"object": sat, "conjunctions": 0,
+                                                "closest_km": float("inf"), "max_risk": 0.0})
+            stats["conjunctions"] += 1
+            stats["closest_km"] = min(stats["closest_km"], r.get("minDistance", 0.0))
+            stats["max_risk"] = max(stats["max_risk"], r.get("riskScore", 0.0))
+
+    top = sorted(risk_data, key=lambda r: r.get("riskScore", 0.0), reverse=True)[:top_k]
+    busiest = sorted(per_object.values(), key=lambda o: (-o["conjunctions"], o["closest_km"]))[:top_k]
+
+    return {
+        "num_conjunctions": len(risk_data),
+        "num_objects": len(per_object),
+        "severity": severity,
+        "closest_km": min(distances) if distances else None,
+        "mean_risk": sum(risks) / len(risks) if risks else 0.0,
+        "top_conjunctions": [
+            {
+                "sat1": r.get("sat1"),
+                "sat2": r.get("sat2"),
+                "minDistance": r.get("minDistance"),
+                "riskScore": r.get("riskScore"),
+                "maneuver": r.get("maneuver", ""),
+            }
+            for r in top
+        ],
+        "per_object": busiest,
+    }
+
+
+def _severity(risk):
+    return "high" if risk > 0.7 else "medium" if risk > 0.4 else "low"
+
+
+# -------------------------------------------------------
+# 2) Narrative sections (LLM, generated in parallel)
+# -------------------------------------------------------
+def _llm_text(prompt):
+    return llm_backends.generate(prompt, model=REPORT_MODEL)
+
+
+def _section_prompt(title, instruction, context):
+    return f"""
     You are a professional space mission control engineer.
-    Generate a structured mission report from this data:
-    {risk_data}
-
-    Must include:
-    - Executive Summary
-    - High Risk Encounters
-    - Recommended Maneuvers
-    - Safety Notes
+    Section: {title}
+    {instruction}
+
+    Screening summary:
+    {context}
+
+    Return plain text only, no headings.
     """
 
+
+def _fallback_section(title, report_data):
+    sev = report_data["severity"]
+    if title == "Executive Summary":
+        closest = report_data["closest_km"]
+        closest_txt = f"{closest:.2f} km" if closest is not None else "n/a"
+        return (f"{report_data['num_conjunctions']} close approaches among {report_data['num_objects']} objects "
+                f"({sev['high']} high, {sev['medium']} medium, {sev['low']} low risk). "
+                f"Closest approach {closest_txt}.")
+    if title == "Recommended Maneuvers":
+        lines = [f"- {c['sat1']} / {c['sat2']}: {c['maneuver'] or 'review required'}"
+                 for c in report_data["top_conjunctions"] if c["riskScore"] and c["riskScore"] > 0.4]
+        return "\n".join(lines) or "No maneuvers required."
+    return "Narrative unavailable; see the tables above."
+
+
+def _generate_section(title, instruction, report_data, context):
     try:
-        model = genai.GenerativeModel("gemini-1.5-flash")
-        response = model.generate_content(prompt)
-        report_text = response.text
+        text = _llm_text(_section_prompt(title, instruction, context))
+        if text and text.strip():
+            return text
+    except Exception as e:
+        print(f"⚠️ Narrative section '{title}' failed, using fallback: {e}")
+    return _fallback_section(title, report_data)
+
+
+def generate_narratives(report_data, context):
+    """
+    Generate every narrative section concurrently; returns {title: text}.
+    `context` is the bounded prompt context from prompt_builder.build_context.
+    """
+    with ThreadPoolExecutor(max_workers=len(NARRATIVE_SECTIONS)) as pool:
+        futures = {
+            title: pool.submit(_generate_section, title, instruction, report_data, context)
+            for title, instruction in NARRATIVE_SECTIONS.items()
+        }
+        return {title: f.result() for title, f in futures.items()}
+
+
+# -------------------------------------------------------
+# 3) PDF rendering
+# -------------------------------------------------------
+def render_report_pdf(report_data, narratives, out_pdf_path):
+    # ReportLab imports for PDF generation
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+    from reportlab.lib.units import inch
+
+    styles = getSampleStyleSheet()
+    table_style = TableStyle([
+        ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
+        ("GRID", (0, 0), (-1, -1), 0.25, colors.grey),
+        ("FONTSIZE", (0, 0), (-1, -1), 8),
+    ])
+
+    def narrative(title):
+        story.append(Paragraph(title, styles["Heading2"]))
+        text = escape(narratives.get(title, "")).replace("\n", "<br/>")
+        story.append(Paragraph(text, styles["Normal"]))
+        story.append(Spacer(1, 0.2 * inch))
+
+    story = []
+    story.append(Paragraph("AI-Generated Collision Report", styles["Title"]))
+    story.append(Spacer(1, 0.25 * inch))
 
-        doc = SimpleDocTemplate(out_pdf_path, pagesize=letter)
-        styles = getSampleStyleSheet()
-        story = []
+    timestamp = f"Generated at: {datetime.datetime.utcnow():%Y-%m-%d %H:%M:%S} UTC"
+    story.append(Paragraph(timestamp, styles["Normal"]))
+    story.append(Spacer(1, 0.25 * inch))
 
-        story.append(Paragraph("AI-Generated Collision Report", styles["Title"]))
-        story.append(Spacer(1, 0.25 * inch))
+    narrative("Executive Summary")
 
-        timestamp = f"Generated at: {datetime.datetime.utcnow():%Y-%m-%d %H:%M:%S} UTC"
-        story.append(Paragraph(timestamp, styles["Normal"]))
-        story.append(Spacer(1, 0.25 * inch))
+    story.append(Paragraph("High Risk Encounters", styles["Heading2"]))
+    rows = [["#", "Object 1", "Object 2", "Min dist (km)", "Risk"]]
+    for idx, c in enumerate(report_data["top_conjunctions"], start=1):
+        rows.append([idx, c["sat1"], c["sat2"], f"{c['minDistance']:.2f}", f"{c['riskScore']:.3f}"])
+    story.append(Table(rows, style=table_style, repeatRows=1))
+    story.append(Spacer(1, 0.2 * inch))
 
-        clean_text = report_text.replace("\n", "<br/>")
-        story.append(Paragraph(clean_text, styles["Normal"]))
+    story.append(Paragraph("Most Congested Objects", styles["Heading2"]))
+    rows = [["Object", "Conjunctions", "Closest (km)", "Max risk"]]
+    for o in report_data["per_object"]:
+        rows.append([o["object"], o["conjunctions"], f"{o['closest_km']:.2f}", f"{o['max_risk']:.3f}"])
+    story.append(Table(rows, style=table_style, repeatRows=1))
+    story.append(Spacer(1, 0.2 * inch))
 
-        doc.build(story)
+    narrative("Recommended Maneuvers")
+    narrative("Safety Notes")
+
+    SimpleDocTemplate(str(out_pdf_path), pagesize=letter).build(story)
+
+
+# -------------------------------------------------------
+# 4) Entry points
+# -------------------------------------------------------
+@timed(REPORT_SECONDS)
+def generate_llm_mission_report(risk_data, out_pdf_path="collision_report.pdf"):
+    """
+    Generates a mission report and saves it directly to a PDF file.
+    Tables come straight from the data; only the narrative sections
+    are written by the LLM (in parallel).
+    Returns: (html_path, pdf_path)
+    """
+    try:
+        report_data = build_report_data(risk_data)
+        context = build_context(risk_data, llm_fn=_llm_text)
+        narratives = generate_narratives(report_data, context)
+        render_report_pdf(report_data, narratives, out_pdf_path)
         print(f"✅ PDF saved to {out_pdf_path}")
+        REPORTS.inc(status="ok")
 
         return None, out_pdf_path
 
     except Exception as e:
         print(f"❌ PDF generation failed: {e}")
+        REPORTS.inc(status="error")
         return None, None
+
+
+def report_cache_key(risk_data):
+    """Stable key for one analysis snapshot."""
+    blob = json.dumps(risk_data, sort_keys=True, default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()[:16]
+
+
+def get_or_build_report(risk_data):
+    """Return the cached PDF for this snapshot, building it on a miss."""
+    REPORT_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    path = REPORT_CACHE_DIR / f"report_{report_cache_key(risk_data)}.pdf"
+    if path.exists():
+        REPORTS.inc(status="cached")
+        os.utime(path)   # LRU: mark as recently used
+        return str(path)
+
+    # Unique per process and thread: concurrent builds of one snapshot each
+    # write their own file, and the last rename wins
+    tmp_path = path.with_name(f"{path.stem}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        _, pdf_path = generate_llm_mission_report(risk_data, out_pdf_path=str(tmp_path))
+        if pdf_path is None:
+            return None
+        os.replace(tmp_path, path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+    evict_reports(keep=path)
+    return str(path)
+
+
+def evict_reports(max_bytes: int = None, keep: Path = None):
+    """
+    Delete least recently used cached PDFs until the cache fits `max_bytes`.
+    `keep` (the report just built) is never deleted. A snapshot whose PDF
+    was evicted gets it rebuilt on the next download.
+    """
+    max_bytes = REPORT_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    entries = []
+    for p in REPORT_CACHE_DIR.glob("report_*.pdf"):
+        try:
+            st = p.stat()
+            entries.append((st.st_mtime, st.st_size, p))
+        except FileNotFoundError:
+            continue
+    total = sum(size for _, size, _ in entries)
+    for _, size, p in sorted(entries, key=lambda e: e[0]):
+        if total <= max_bytes:
+            break
+        if p == keep:
+            continue
+        p.unlink(missing_ok=True)
+        total -= size
+
+
+async def generate_report_async(risk_data):
+    """Build (or fetch) the snapshot's PDF off the event loop."""
+    return await asyncio.to_thread(get_or_build_report, risk_data)
@@ -0,0 +1,47 @@
+# -----------------------------
+# File: app/telemetry/profiling.py
+# -----------------------------
+"""
+Opt-in per-run profiling.
+
+Set PROFILE_RUNS=1 (or pass profile=true to /api/analyze) to record a
+cProfile dump for a pipeline run into PROFILE_DIR (default ./profiles).
+Dumps are standard pstats files (snakeviz, `python -m pstats`). For
+sampling with py-spy, attach to the worker PID reported in the run's
+first event: `py-spy record --pid <pid>`.
+"""
+import contextlib
+import cProfile
+import os
+from pathlib import Path
+
+
+def profiling_enabled(requested: bool = False) -> bool:
+    return requested or os.getenv("PROFILE_RUNS", "").lower() in ("1", "true", "yes")
+
+
+@contextlib.contextmanager
+def profile_run(run_id: str, enabled: bool):
+    """
+    Profile the enclosed block into PROFILE_DIR/<run_id>.prof when enabled.
+    Yields the output path (or None when disabled).
+
+    cProfile is per-thread: inside the event loop it also records other
+    requests interleaved on the same thread.
+    """
+    if not enabled:
+        yield None
+        return
+
+    out_dir = Path(os.getenv("PROFILE_DIR", "profiles"))
+    out_dir.mkdir(parents=True, exist_ok=True)
+    out_path = out_dir / f"{run_id}.prof"
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield out_path
+    finally:
+        profiler.disable()
+        profiler.dump_stats(str(out_path))
+        print(f"[PROFILE] Run {run_id} written to {out_path}")
@@ -0,0 +1,284 @@
+"""
+Benchmark the full A -> B -> C -> D pipeline on synthetic catalogs.
+
+Usage:
+    python -m benchmarks.bench_pipeline [--sizes 100 1000 5000] [--minutes 120] [--step 10]
+                                        [--threshold 20.0] [--adaptive] [--llm-backend synthetic]
+                                        [--llm-latency fixed:200] [--out results.json]
+                                        [--compare old.json]
+
+Each stage (load, parse, propagate, screen, score, negotiate, report) is
+timed separately. Its tracemalloc peak comes from a second, untimed pass,
+because tracing slows down the Python-heavy stages. The LLM calls of Model C
+and Model D go to an offline backend (synthetic by default, or replay of
+recorded responses) with an optional latency distribution, so the numbers
+are reproducible and need no network. --adaptive screens with per-pair adaptive stepping
+(30 s base grid) instead of the uniform --step grid. Results are written as JSON so runs from different
+commits can be compared with --compare.
+"""
+import argparse
+import contextlib
+import io
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import networkx as nx
+
+from app.model_a import ephemeris_cache
+from app.model_a.orbit_engine import (
+    _parse_satrecs,
+    _propagate_states_window,
+    _propagate_window,
+    _screen_adaptive,
+    _screen_all_pairs,
+    load_tles_from_file,
+)
+from app.model_b.risk_predictor import explain_edge, heuristic_risk_scores
+from app.model_c import llm_backends, negotiation_planner
+from app.model_d import report_generator
+from benchmarks.synthetic_catalog import generate_catalog, write_catalog
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+
+# -------------------------------------------------------
+# Offline LLM backends
+# -------------------------------------------------------
+def offline_backend(kind="synthetic", latency=None, seed=42, record_dir=None):
+    """Build the offline LLM backend used for the negotiate and report stages."""
+    if kind == "replay":
+        return llm_backends.ReplayBackend(
+            record_dir or llm_backends.DEFAULT_RECORD_DIR, latency or "recorded", seed, miss="any"
+        )
+    return llm_backends.SyntheticBackend(latency or "none", seed)
+
+
+# -------------------------------------------------------
+# Stage timing
+# -------------------------------------------------------
+class StageTimer:
+    """Records per-stage wall time, or with `trace_memory` the tracemalloc peak instead."""
+
+    def __init__(self, trace_memory=False):
+        self.trace_memory = trace_memory
+        self.stages = {}
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        if self.trace_memory:
+            tracemalloc.start()
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            if self.trace_memory:
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                self.stages[name] = {"peak_mb": round(peak / 2 ** 20, 3)}
+            else:
+                self.stages[name] = {"seconds": round(elapsed, 6)}
+
+
+def run_pipeline_benchmark(n_objects, workdir, sample_minutes=120, step_min=10,
+                           close_threshold_km=20.0, seed=42, adaptive=False, base_step_s=30.0,
+                           llm_backend=None, trace_memory=False):
+    timer = StageTimer(trace_memory)
+    catalog_path = write_catalog(generate_catalog(n_objects, seed=seed),
+                                 Path(workdir) / f"synthetic_{n_objects}.tle")
+
+    with timer.stage("load"):
+        tles = load_tles_from_file(catalog_path)
+
+    G = nx.Graph()
+    with timer.stage("parse"):
+        sat_objects = _parse_satrecs(tles, G)
+
+    names = [name for name, _ in sat_objects]
+    if adaptive:
+        with timer.stage("propagate"):
+            states = _propagate_states_window(sat_objects, sample_minutes, base_step_s)
+        with timer.stage("screen"):
+            _screen_adaptive(G, names, states, range(len(names)), base_step_s, close_threshold_km)
+    else:
+        with timer.stage("propagate"):
+            positions = _propagate_window(sat_objects, sample_minutes, step_min)
+        with timer.stage("screen"):
+            _screen_all_pairs(G, names, positions, close_threshold_km)
+
+    with timer.stage("score"):
+        heuristic_risk_scores(G)
+
+    # Model D imports ReportLab lazily; warm it up so the report stage
+    # measures steady-state rendering rather than the one-off import.
+    import reportlab.platypus  # noqa: F401
+
+    edges_info = []
+    backend = llm_backend or offline_backend(seed=seed)
+    with llm_backends.use_backend(backend), contextlib.redirect_stdout(io.StringIO()):
+        with timer.stage("negotiate"):
+            for u, v, data in G.edges(data=True):
+                min_dist = round(data.get("min_distance_km", 0.0), 2)
+                risk = round(data.get("risk_score", 0.0), 3)
+                llm = negotiation_planner.run_multi_llm_negotiation(u, v, min_dist)
+                edges_info.append({
+                    "sat1": u,
+                    "sat2": v,
+                    "minDistance": min_dist,
+                    "riskScore": risk,
+                    "description": explain_edge(u, v, G),
+                    "maneuver": llm["final_decision"],
+                    "proposal": llm["proposal"],
+                    "critique": llm["critique"],
+                })
+
+        with timer.stage("report"):
+            report_generator.generate_llm_mission_report(
+                edges_info, out_pdf_path=str(Path(workdir) / f"report_{n_objects}.pdf")
+            )
+
+    return {
+        "n_objects": n_objects,
+        "n_parsed": len(sat_objects),
+        "n_samples": states[0].n_times if adaptive else positions.shape[1],
+        "n_edges": G.number_of_edges(),
+        "stages": timer.stages,
+    }
+
+
+def benchmark_size(n_objects, workdir, sample_minutes, step_min, close_threshold_km, seed,
+                   adaptive=False, llm_kind="synthetic", llm_latency=None):
+    """
+    Run the pipeline twice: a timed pass, then an untimed tracemalloc pass
+    (without LLM latency), and merge the per-stage seconds and peaks.
+    """
+    run = run_pipeline_benchmark(n_objects, workdir, sample_minutes, step_min, close_threshold_km, seed,
+                                 adaptive=adaptive,
+                                 llm_backend=offline_backend(llm_kind, llm_latency, seed))
+    memory = run_pipeline_benchmark(n_objects, workdir, sample_minutes, step_min, close_threshold_km, seed,
+                                    adaptive=adaptive,
+                                    llm_backend=offline_backend(llm_kind, "none", seed),
+                                    trace_memory=True)
+    for name, stage in run["stages"].items():
+        stage["peak_mb"] = memory["stages"][name]["peak_mb"]
+    run["total_seconds"] = round(sum(s["seconds"] for s in run["stages"].values()), 6)
+    return run
+
+
+# -------------------------------------------------------
+# Results I/O and regression comparison
+# -------------------------------------------------------
+def _git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except Exception:
+        return "unknown"
+
+
+def _peak_rss_mb():
+    try:
+        import resource
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return round(rss / (2 ** 20 if sys.platform == "darwin" else 2 ** 10), 1)
+    except Exception:
+        return None
+
+
+def compare_results(old, new, tolerance=0.10, noise_floor_s=0.01):
+    """
+    Print per-stage ratios new/old; return the stages that regressed.
+    Stages faster than `noise_floor_s` in both runs are never flagged.
+    """
+    old_runs = {r["n_objects"]: r for r in old["runs"]}
+    regressions = []
+    print(f"\nComparison vs {old.get('commit')} (tolerance {tolerance:.0%}):")
+    for run in new["runs"]:
+        base = old_runs.get(run["n_objects"])
+        if base is None:
+            continue
+        for name, stage in run["stages"].items():
+            before = base["stages"].get(name, {}).get("seconds")
+            if not before:
+                continue
+            ratio = stage["seconds"] / before
+            slow = max(before, stage["seconds"]) >= noise_floor_s
+            flag = " REGRESSION" if slow and ratio > 1 + tolerance else ""
+            print(f"  n={run['n_objects']:<6} {name:<10} {before:>9.4f}s -> {stage['seconds']:>9.4f}s  x{ratio:5.2f}{flag}")
+            if flag:
+                regressions.append((run["n_objects"], name, ratio))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the A->B->C->D pipeline on synthetic catalogs')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 5000], help='Catalog sizes (100 to 50000)')
+    parser.add_argument('--minutes', type=int, default=120, help='Total minutes to sample')
+    parser.add_argument('--step', type=int, default=10, help='Step in minutes between samples')
+    parser.add_argument('--threshold', type=float, default=20.0, help='Close approach threshold in km')
+    parser.add_argument('--seed', type=int, default=42, help='Catalog generator seed')
+    parser.add_argument('--llm-backend', choices=['synthetic', 'replay'], default='synthetic',
+                        help='Offline LLM backend for Model C/D (replay reads LLM_RECORD_DIR)')
+    parser.add_argument('--llm-latency', default=None,
+                        help='LLM latency spec, e.g. fixed:200, uniform:100:400, lognormal:300:0.5')
+    parser.add_argument('--adaptive', action='store_true', help='Screen with per-pair adaptive time stepping')
+    parser.add_argument('--ephemeris-cache', action='store_true', help='Allow propagation to hit the ephemeris cache')
+    parser.add_argument('--out', default=None, help='Results JSON path (default benchmarks/results/<commit>.json)')
+    parser.add_argument('--compare', default=None, help='Previous results JSON to compare against')
+    args = parser.parse_args()
+
+    # Measure SGP4 itself unless the cache is explicitly part of the run
+    ephemeris_cache.CACHE_ENABLED = args.ephemeris_cache
+
+    results = {
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": {
+            "sample_minutes": args.minutes,
+            "step_min": args.step,
+            "close_threshold_km": args.threshold,
+            "seed": args.seed,
+            "ephemeris_cache": args.ephemeris_cache,
+            "adaptive": args.adaptive,
+            "llm_backend": args.llm_backend,
+            "llm_latency": args.llm_latency,
+        },
+        "runs": [],
+    }
+
+    with tempfile.TemporaryDirectory() as workdir:
+        for n in args.sizes:
+            print(f"Benchmarking n={n}...")
+            run = benchmark_size(n, workdir, args.minutes, args.step, args.threshold, args.seed,
+                                 adaptive=args.adaptive, llm_kind=args.llm_backend,
+                                 llm_latency=args.llm_latency)
+            results["runs"].append(run)
+            for name, stage in run["stages"].items():
+                print(f"  {name:<10} {stage['seconds']:>9.4f}s  peak {stage['peak_mb']:>9.2f} MB")
+            print(f"  {'total':<10} {run['total_seconds']:>9.4f}s  edges {run['n_edges']}")
+
+    results["peak_rss_mb"] = _peak_rss_mb()
+
+    out = Path(args.out) if args.out else RESULTS_DIR / f"{results['commit']}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults written to {out}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare_results(json.load(f), results)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
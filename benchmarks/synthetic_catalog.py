@@ -0,0 +1,152 @@
+# -----------------------------
+# File: benchmarks/synthetic_catalog.py
+# -----------------------------
+"""
+Synthetic TLE catalogs for benchmarking.
+
+Generates realistic-looking catalogs made of constellation shells
+(Starlink/OneWeb-like) plus fragmentation debris clouds that share a
+parent orbit, like the bundled cosmos2251.tle / iridium33.tle fragments.
+All lines carry valid TLE checksums.
+"""
+import datetime
+import math
+import random
+from pathlib import Path
+from typing import List
+
+from app.model_a.catalog import TLE, tle_checksum
+
+MU_EARTH = 398600.4418   # km^3 / s^2
+R_EARTH = 6378.137       # km
+
+# (name, altitude_km, inclination_deg, share of the shell population)
+SHELLS = [
+    ("SHELL-A", 550.0, 53.0, 0.40),
+    ("SHELL-B", 540.0, 53.2, 0.20),
+    ("SHELL-C", 570.0, 70.0, 0.10),
+    ("SHELL-D", 560.0, 97.6, 0.15),
+    ("SHELL-E", 1200.0, 87.9, 0.15),
+]
+
+# (name, intl designator, altitude_km, inclination_deg, eccentricity)
+DEBRIS_PARENTS = [
+    ("COSMOS 2251 DEB", "93036", 790.0, 74.0, 0.002),
+    ("IRIDIUM 33 DEB", "97051", 780.0, 86.4, 0.002),
+]
+
+
+# -------------------------------------------------------
+# TLE formatting
+# -------------------------------------------------------
+def _tle_exp(value: float) -> str:
+    """Format a value in the TLE 'assumed decimal point' notation (8 chars)."""
+    if value == 0:
+        return " 00000-0"
+    sign = "-" if value < 0 else " "
+    exp = math.floor(math.log10(abs(value))) + 1
+    mantissa = int(round(abs(value) / 10 ** exp * 1e5))
+    if mantissa >= 100000:
+        mantissa //= 10
+        exp += 1
+    return f"{sign}{mantissa:05d}{'-' if exp < 0 else '+'}{abs(exp) % 10}"
+
+
+def mean_motion_rev_per_day(altitude_km: float) -> float:
+    a = R_EARTH + altitude_km
+    n = math.sqrt(MU_EARTH / a ** 3)
+    return n * 86400.0 / (2 * math.pi)
+
+
+def format_tle(
+    name: str,
+    satnum: int,
+    intl: str,
+    epoch_yy: int,
+    epoch_doy: float,
+    inc: float,
+    raan: float,
+    ecc: float,
+    argp: float,
+    ma: float,
+    mm: float,
+    bstar: float = 1e-4,
+) -> TLE:
+    l1 = (
+        f"1 {satnum:05d}U {intl:<8} {epoch_yy:02d}{epoch_doy:012.8f}  .00001000  00000-0 "
+        f"{_tle_exp(bstar)} 0  999"
+    )
+    l1 += str(tle_checksum(l1))
+    l2 = (
+        f"2 {satnum:05d} {inc:8.4f} {raan % 360:8.4f} {int(round(ecc * 1e7)):07d} "
+        f"{argp % 360:8.4f} {ma % 360:8.4f} {mm:11.8f}{1000:5d}"
+    )
+    l2 += str(tle_checksum(l2))
+    return (name, l1, l2)
+
+
+# -------------------------------------------------------
+# Catalog generation
+# -------------------------------------------------------
+def generate_catalog(
+    n_objects: int,
+    debris_fraction: float = 0.3,
+    seed: int = 42,
+    epoch: datetime.datetime = None,
+) -> List[TLE]:
+    """
+    Generate `n_objects` TLEs: shells of evenly phased satellites plus
+    `debris_fraction` of fragments dispersed around the debris parents.
+    The epoch defaults to now so propagation stays close to epoch.
+    """
+    rng = random.Random(seed)
+    epoch = epoch or datetime.datetime.utcnow()
+    epoch_yy = epoch.year % 100
+    start_of_year = datetime.datetime(epoch.year, 1, 1)
+    epoch_doy = 1 + (epoch - start_of_year).total_seconds() / 86400.0
+    tles = []
+    satnum = 10000
+
+    n_debris = int(n_objects * debris_fraction)
+    n_shell = n_objects - n_debris
+
+    # Constellation shells: planes x slots with small jitter
+    for shell_name, alt, inc, share in SHELLS:
+        count = int(round(n_shell * share))
+        if shell_name == SHELLS[-1][0]:
+            count = n_shell - len(tles)
+        planes = max(1, int(math.sqrt(count)))
+        mm = mean_motion_rev_per_day(alt)
+        for k in range(count):
+            plane, slot = divmod(k, max(1, math.ceil(count / planes)))
+            raan = 360.0 * plane / planes + rng.uniform(-0.05, 0.05)
+            ma = 360.0 * slot / max(1, math.ceil(count / planes)) + rng.uniform(-0.5, 0.5)
+            tles.append(format_tle(
+                f"{shell_name}-{k:05d}", satnum, f"20001{chr(65 + k % 26)}",
+                epoch_yy, epoch_doy, inc + rng.uniform(-0.01, 0.01), raan,
+                0.0001 + rng.uniform(0, 0.0002), rng.uniform(0, 360), ma,
+                mm * (1 + rng.uniform(-1e-5, 1e-5)),
+            ))
+            satnum += 1
+
+    # Debris clouds: fragments share the parent orbit with a velocity dispersion.
+    # Names carry the catalog number so every fragment stays its own graph node.
+    for k in range(n_debris):
+        name, intl, alt, inc, ecc = DEBRIS_PARENTS[k % len(DEBRIS_PARENTS)]
+        mm = mean_motion_rev_per_day(alt + rng.gauss(0, 15.0))
+        tles.append(format_tle(
+            f"{name} {satnum}", satnum, f"{intl}{chr(65 + k % 26)}{chr(65 + (k // 26) % 26)}",
+            epoch_yy, epoch_doy, inc + rng.gauss(0, 0.1), 120.0 + rng.gauss(0, 0.5),
+            max(0.0, ecc + rng.gauss(0, 0.001)), rng.uniform(0, 360),
+            200.0 + rng.gauss(0, 20.0), mm, bstar=rng.uniform(1e-5, 1e-3),
+        ))
+        satnum += 1
+
+    return tles
+
+
+def write_catalog(tles: List[TLE], path: Path) -> Path:
+    with open(path, "w") as f:
+        for name, l1, l2 in tles:
+            f.write(f"{name}\n{l1}\n{l2}\n")
+    return path
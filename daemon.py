@@ -0,0 +1,82 @@
+"""
+Long-running screening daemon with a rolling horizon.
+
+Usage:
+    python daemon.py [--horizon 120] [--step 10] [--threshold 10.0] [--tick 60]
+                     [--source starlink.tle ...] [--api-url http://127.0.0.1:8000] [--once]
+
+Propagated states are kept in memory between ticks: each tick only
+propagates the newly exposed time slice and publishes the conjunction
+diff (new / updated / cleared) to the API's /api/monitor/diff endpoint.
+"""
+import argparse
+import datetime
+import json
+import time
+
+import requests
+
+from app.model_a.catalog import format_merge_report
+from app.model_a.orbit_engine import STATIC_TLE_FILES, load_merged_catalog
+from app.model_a.rolling_screener import RollingScreener
+
+
+def publish_diff(api_url: str, diff: dict, snapshot: list):
+    try:
+        requests.post(
+            f"{api_url.rstrip('/')}/api/monitor/diff",
+            json={"diff": diff, "conjunctions": snapshot},
+            timeout=10,
+        )
+    except Exception as e:
+        print(f"[ERROR] Could not publish diff to {api_url}: {e}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Rolling-horizon conjunction screening daemon')
+    parser.add_argument('--horizon', type=int, default=120, help='Screening horizon in minutes')
+    parser.add_argument('--step', type=int, default=10, help='Step in minutes between samples')
+    parser.add_argument('--threshold', type=float, default=10.0, help='Close approach threshold in km')
+    parser.add_argument('--tick', type=float, default=60.0, help='Seconds between ticks')
+    parser.add_argument('--source', nargs='*', default=STATIC_TLE_FILES, help='TLE files inside app/data/')
+    parser.add_argument('--api-url', default=None, help='Publish diffs to this API base URL')
+    parser.add_argument('--once', action='store_true', help='Run a single tick and exit')
+    args = parser.parse_args()
+
+    # Merged by NORAD ID: objects listed in several files are screened once,
+    # and distinct objects sharing a name get unique node names
+    tles, report = load_merged_catalog(args.source)
+    print(f"Catalog: {format_merge_report(report)}")
+
+    screener = RollingScreener(
+        tles,
+        horizon_minutes=args.horizon,
+        step_min=args.step,
+        close_threshold_km=args.threshold,
+    )
+    print(f'Monitoring {len(screener.names)} objects, horizon {args.horizon} min, tick {args.tick}s')
+
+    while True:
+        started = time.perf_counter()
+        diff = screener.tick()
+        elapsed = time.perf_counter() - started
+
+        print(
+            f"[{datetime.datetime.utcnow():%H:%M:%S}] tick {diff['tick']}: "
+            f"+{diff['propagated_slices']} slices in {elapsed:.2f}s, "
+            f"{len(diff['new'])} new, {len(diff['updated'])} updated, {len(diff['cleared'])} cleared, "
+            f"{len(screener.conjunctions)} active"
+        )
+
+        if args.api_url:
+            publish_diff(args.api_url, diff, screener.snapshot())
+        elif diff['new'] or diff['updated'] or diff['cleared']:
+            print(json.dumps(diff, indent=2))
+
+        if args.once:
+            break
+        time.sleep(max(0.0, args.tick - elapsed))
+
+
+if __name__ == '__main__':
+    main()
@@ -98,8 +98,24 @@ const API_BASE = "http://127.0.0.1:8000";
     }
 
     const data = await res.json();
+    if (data.status !== "accepted") {
+      throw new Error("No valid TLEs in upload");
+    }
+
+    setLogs((prev) => [...prev, `✅ Upload complete (${data.accepted} TLEs, ${data.rejected} rejected)`]);
+    setUploadProgress(60);
+
+    // Screening runs as a background job; poll until it finishes
+    let job = { status: "queued" };
+    while (job.status === "queued" || job.status === "running") {
+      await new Promise((resolve) => setTimeout(resolve, 1000));
+      const jobRes = await fetch(`${API_BASE}/api/jobs/${data.job_id}`);
+      job = await jobRes.json();
+    }
+    if (job.status !== "done") {
+      throw new Error(job.error || "Screening failed");
+    }
 
-    setLogs((prev) => [...prev, "✅ Upload complete"]);
     setLogs((prev) => [...prev, "🛰️ Orbit processing finished"]);
 
     setUploadProgress(100);
@@ -0,0 +1,92 @@
+# -----------------------------
+# File: tests/test_analyze_coalescing.py
+# -----------------------------
+"""
+/api/analyze single-flight: concurrent identical requests share one
+pipeline run, and a completed result is reused within the freshness
+window. The pipeline itself is replaced by a short fake event stream.
+"""
+import asyncio
+import json
+import time
+
+from app.api import main
+from app.api.state_store import MemoryStore, use_store
+
+
+def _fake_pipeline(runs):
+    async def pipeline(source, sample_minutes, primary_source, primary_ids, run_id, cloud_source):
+        runs.append(run_id)
+        key = main.analysis_key(source, sample_minutes, primary_source, primary_ids, cloud_source)
+        for stage in ("init", "model_a", "model_c"):
+            yield f"data: {json.dumps({'stage': stage, 'run_id': run_id})}\n\n"
+            await asyncio.sleep(0.01)
+        summary = {"stage": "complete", "summary": {"dataset": source}}
+        main.get_store().put(f"snapshot:{key}", {})
+        main.get_store().put(f"summary:{key}", {"summary": summary, "completed_at": time.time()})
+        yield f"data: {json.dumps(summary)}\n\n"
+    return pipeline
+
+
+async def _stages(**params):
+    response = await main.api_analyze_stream(**params)
+    return [json.loads(event[len("data: "):])["stage"] async for event in response.body_iterator]
+
+
+def test_identical_requests_share_one_run_and_reuse_fresh_results(monkeypatch):
+    runs = []
+    monkeypatch.setattr(main, "pipeline_generator", _fake_pipeline(runs))
+
+    async def scenario():
+        concurrent = await asyncio.gather(*[_stages(source="starlink") for _ in range(5)])
+        reused = await _stages(source="starlink")
+        other = await _stages(source="starlink", sample_minutes=60)
+        monkeypatch.setattr(main, "ANALYZE_FRESHNESS_S", 0.0)
+        expired = await _stages(source="starlink")
+        return concurrent, reused, other, expired
+
+    with use_store(MemoryStore()):
+        concurrent, reused, other, expired = asyncio.run(scenario())
+
+    assert all(stages == ["init", "model_a", "model_c", "complete"] for stages in concurrent)
+    assert reused == ["reused", "complete"]
+    assert other[-1] == expired[-1] == "complete"
+    assert len(runs) == 3
+    assert not main.INFLIGHT
+
+
+def test_old_snapshots_and_jobs_are_dropped(monkeypatch):
+    monkeypatch.setattr(main, "SNAPSHOTS_KEPT", 2)
+    monkeypatch.setattr(main, "JOB_RETENTION_S", 60.0)
+    with use_store(MemoryStore()) as store:
+        for key in ("a", "b", "c"):
+            main.publish_snapshot(main.Snapshot(key, main.nx.Graph(), [], 2.0), f"{key}.pdf")
+            store.put(f"summary:{key}", {"summary": {}, "completed_at": time.time()})
+        main.make_latest(store, "b")   # reusing "b" keeps it over "c"
+        main.publish_snapshot(main.Snapshot("d", main.nx.Graph(), [], 2.0))
+        assert store.get("snapshot:index") == ["b", "d"]
+        assert all(store.version(f"{prefix}:{key}") == 0 for prefix in ("snapshot", "summary", "report")
+                   for key in ("a", "c"))
+        assert store.get("summary:b") is not None and main.current_snapshot().key == "d"
+
+        main.create_job("old", {"status": "done"})
+        later = time.time() + 120.0
+        monkeypatch.setattr(main.time, "time", lambda: later)
+        main.create_job("new", {"status": "queued"})
+        assert store.get("job:old") is None and store.get("job:new")["status"] == "queued"
+
+
+def test_finished_run_does_not_evict_a_newer_one():
+    async def scenario():
+        async def events():
+            yield "data: {}\n\n"
+
+        old, new = main.SharedRun(events()), main.SharedRun(events())
+        main.INFLIGHT["k"] = new
+        main.forget_run("k", old)
+        assert main.INFLIGHT["k"] is new
+        main.forget_run("k", new)
+        await asyncio.gather(old.task, new.task)
+
+    asyncio.run(scenario())
+    assert "k" not in main.INFLIGHT
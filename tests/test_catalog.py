@@ -0,0 +1,58 @@
+# -----------------------------
+# File: tests/test_catalog.py
+# -----------------------------
+"""
+Catalog merge: NORAD-ID deduplication, freshest epoch, checksum rejects.
+"""
+from app.model_a.catalog import TLEStreamParser, checksum_ok, merge_catalogs, tle_checksum, tle_epoch
+
+L1 = "1 44714U 19074B   25328.21336338  .00001153  00000+0  96250-4 0  9995"
+L2 = "2 44714  53.0556 300.1163 0001468  99.2377 260.8778 15.06411664332859"
+
+
+def _with_epoch(l1, epoch_field):
+    line = l1[:18] + epoch_field + l1[32:68]
+    return line + str(tle_checksum(line))
+
+
+def test_checksum_and_epoch():
+    assert checksum_ok(L1) and checksum_ok(L2)
+    assert not checksum_ok(L1[:68] + "0")
+    assert tle_epoch(L1).strftime("%Y-%m-%d") == "2025-11-24"
+
+
+def test_merge_keeps_freshest_epoch_per_norad_id():
+    newer = _with_epoch(L1, "25330.00000000")
+    tles, report = merge_catalogs({
+        "active.tle": [("STARLINK-1008", L1, L2)],
+        "starlink.tle": [("STARLINK-1008", newer, L2)],
+    })
+    assert tles == [("STARLINK-1008", newer, L2)]
+    assert report["unique"] == 1 and report["total"] == 2
+    assert report["duplicates"][0]["kept"] == "starlink.tle"
+
+
+def test_merge_rejects_bad_checksums_and_disambiguates_names():
+    other_l1 = L1.replace("44714", "44715")
+    other_l1 = other_l1[:68] + str(tle_checksum(other_l1))
+    other_l2 = L2.replace("44714", "44715")
+    other_l2 = other_l2[:68] + str(tle_checksum(other_l2))
+
+    tles, report = merge_catalogs({"debris.tle": [
+        ("DEB", L1, L2),
+        ("DEB", other_l1, other_l2),
+        ("BROKEN", L1[:68] + "0", L2),
+    ]})
+    assert [t[0] for t in tles] == ["DEB [44714]", "DEB [44715]"]
+    assert report["rejects"] == [{"source": "debris.tle", "name": "BROKEN", "reason": "line 1 checksum mismatch"}]
+
+
+def test_stream_parser_handles_split_chunks_and_unnamed_sets():
+    text = f"STARLINK-1008\n{L1}\n{L2}\n\n{L1}\r\n{L2}"
+    parser = TLEStreamParser()
+    out = []
+    for i in range(0, len(text), 7):
+        out += parser.feed(text[i:i + 7])
+    out += parser.close()
+
+    assert out == [("STARLINK-1008", L1, L2), ("44714", L1, L2)]
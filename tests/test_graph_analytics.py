@@ -0,0 +1,89 @@
+# -----------------------------
+# File: tests/test_graph_analytics.py
+# -----------------------------
+"""
+Sparse conjunction-graph analytics agree with networkx, including after
+incremental edge updates and monitor diffs.
+"""
+import datetime
+
+import networkx as nx
+import numpy as np
+
+from app.model_a.orbit_engine import DATA_DIR, load_tles_from_file
+from app.model_a.rolling_screener import RollingScreener
+from app.model_b.graph_analytics import ConjunctionAnalytics, altitude_from_tle
+
+
+def _random_graph(n=300, m=900, seed=0):
+    rng = np.random.default_rng(seed)
+    G = nx.Graph()
+    G.add_nodes_from(f"SAT-{i}" for i in range(n))
+    for a, b in rng.integers(0, n, size=(m, 2)):
+        if a != b:
+            G.add_edge(f"SAT-{a}", f"SAT-{b}", min_distance_km=float(rng.uniform(0, 20)))
+    return G
+
+
+def _assert_matches(analytics, G):
+    cores = nx.core_number(G)
+    labels = analytics.components()
+    for i, name in enumerate(analytics.names):
+        assert analytics.degree[i] == G.degree(name)
+        assert analytics.core_numbers()[i] == cores[name]
+        assert analytics.component_sizes()[labels[i]] == len(nx.node_connected_component(G, name))
+
+
+def test_analytics_match_networkx_under_incremental_updates():
+    G = _random_graph()
+    analytics = ConjunctionAnalytics.from_graph(G)
+    assert analytics.n_edges == G.number_of_edges()
+    _assert_matches(analytics, G)
+
+    removed = list(G.edges())[::3]
+    G.remove_edges_from(removed)
+    analytics.remove_edges(removed)
+    G.add_edge("SAT-1", "NEW-1", min_distance_km=1.0)
+    analytics.apply_diff({
+        "new": [{"sat1": "SAT-1", "sat2": "NEW-1", "minDistance": 1.0}],
+        "updated": [{"sat1": u, "sat2": v, "minDistance": 0.5} for u, v in list(G.edges())[:5]],
+        "cleared": [],
+    })
+    assert analytics.n_edges == G.number_of_edges()
+    _assert_matches(analytics, G)
+
+
+def test_summary_rates_and_altitude_bands():
+    l2 = "2 44713  53.0554 195.4980 0001239  87.3517 272.7633 15.06391848 47563"
+    G = nx.Graph()
+    for name in ("A", "B", "C"):
+        G.add_node(name, tle=("", l2))
+    G.add_edge("A", "B", min_distance_km=3.0)
+    G.add_edge("A", "C", min_distance_km=8.0)
+
+    summary = ConjunctionAnalytics.from_graph(G, window_hours=12.0).summary()
+    top = summary["top_objects"][0]
+    assert top["object"] == "A" and top["rate_per_day"] == 4.0
+    assert summary["components"]["largest"] == [3]
+
+    alt = altitude_from_tle(l2)
+    assert 500 < alt < 600
+    band = summary["altitude_bands"][0]
+    assert band["band_km"][0] <= alt < band["band_km"][1]
+    assert band["conjunctions"] == 2 and band["objects"] == 3
+
+
+def test_monitor_records_carry_altitudes():
+    tles = load_tles_from_file(DATA_DIR / "starlink.tle")[:20]
+    screener = RollingScreener(tles, horizon_minutes=30, step_min=10, close_threshold_km=2000.0)
+    diff = screener.tick(datetime.datetime(2025, 11, 25))
+    assert diff["new"]
+    line2 = {name: l2 for name, _, l2 in tles}
+    for r in diff["new"]:
+        assert r["alt1"] == round(altitude_from_tle(line2[r["sat1"]]), 1)
+
+    analytics = ConjunctionAnalytics(window_hours=0.5)
+    analytics.apply_diff(diff)
+    summary = analytics.summary()
+    assert summary["altitude_bands"]
+    assert sum(b["conjunctions"] for b in summary["altitude_bands"]) == len(diff["new"])
@@ -0,0 +1,43 @@
+# -----------------------------
+# File: tests/test_import_budget.py
+# -----------------------------
+"""
+Import-time budget: the orbit/risk path and the model modules must import
+without pulling in the LLM SDKs, ReportLab or scipy.sparse, and within a
+time budget.
+The check runs in a fresh interpreter so earlier imports cannot hide a
+regression. Override the budget with IMPORT_BUDGET_S.
+"""
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+HEAVY_MODULES = ["google.genai", "google.generativeai", "reportlab", "scipy.sparse"]
+
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import app.model_a.orbit_engine
+import app.model_b.risk_predictor
+import app.model_b.graph_analytics
+import app.model_c.negotiation_planner
+import app.model_d.report_generator
+elapsed = time.perf_counter() - started
+print(json.dumps({"seconds": elapsed, "modules": sorted(sys.modules)}))
+"""
+
+
+def test_model_imports_stay_light():
+    out = subprocess.run(
+        [sys.executable, "-c", PROBE], cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    result = json.loads(out.stdout.strip().splitlines()[-1])
+
+    loaded = [m for m in HEAVY_MODULES if m in result["modules"]]
+    assert not loaded, f"heavy backends imported eagerly: {loaded}"
+
+    budget = float(os.getenv("IMPORT_BUDGET_S", "1.5"))
+    assert result["seconds"] < budget, f"model imports took {result['seconds']:.2f}s (budget {budget}s)"
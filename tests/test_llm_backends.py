@@ -0,0 +1,60 @@
+# -----------------------------
+# File: tests/test_llm_backends.py
+# -----------------------------
+"""
+LLM backends: record/replay round trip, synthetic determinism, and the
+negotiation loop running fully offline.
+"""
+import random
+
+import pytest
+
+from app.model_c import llm_backends, negotiation_planner
+
+
+class _EchoBackend:
+    name = "echo"
+
+    def __init__(self):
+        self.calls = 0
+
+    def generate(self, prompt, model, max_tokens):
+        self.calls += 1
+        return f"{model}: {prompt[::-1]}"
+
+
+def test_recorded_responses_replay_without_network(tmp_path):
+    live = _EchoBackend()
+    recorder = llm_backends.RecordingBackend(live, tmp_path)
+    with llm_backends.use_backend(recorder):
+        recorded = [llm_backends.generate(p, model="m1") for p in ("alpha", "beta")]
+    assert live.calls == 2
+
+    replay = llm_backends.ReplayBackend(tmp_path, latency="none")
+    with llm_backends.use_backend(replay):
+        assert [llm_backends.generate(p, model="m1") for p in ("alpha", "beta")] == recorded
+        with pytest.raises(llm_backends.LLMUnavailable):
+            llm_backends.generate("never recorded", model="m1")
+
+    fallback = llm_backends.ReplayBackend(tmp_path, latency="none", miss="any")
+    assert fallback.generate("never recorded", "m1", 64) in recorded
+
+
+def test_latency_specs():
+    rng = random.Random(0)
+    assert llm_backends.parse_latency("none")(rng, None) == 0.0
+    assert llm_backends.parse_latency("fixed:250")(rng, None) == 0.25
+    assert 0.1 <= llm_backends.parse_latency("uniform:100:200")(rng, None) <= 0.2
+    assert llm_backends.parse_latency("recorded")(rng, 1.5) == 1.5
+    with pytest.raises(ValueError):
+        llm_backends.parse_latency("gaussian:1")
+
+
+def test_negotiation_runs_offline_and_reproducibly():
+    with llm_backends.use_backend(llm_backends.SyntheticBackend(seed=1)):
+        first = negotiation_planner.run_multi_llm_negotiation("SAT-A", "SAT-B", 0.4)
+        second = negotiation_planner.run_multi_llm_negotiation("SAT-A", "SAT-B", 0.4)
+
+    assert first["final_decision"] == second["final_decision"]
+    assert 55 <= first["confidence"] <= 95
+    assert not first["final_decision"].startswith(("ERROR", "GEMINI_CALL_ERROR"))
@@ -0,0 +1,23 @@
+# -----------------------------
+# File: tests/test_metrics.py
+# -----------------------------
+"""
+Prometheus text rendering of the in-process metrics registry.
+"""
+from app.telemetry.metrics import Registry
+
+
+def test_counter_and_histogram_render():
+    registry = Registry()
+    calls = registry.counter("llm_calls_total", "LLM calls")
+    latency = registry.histogram("llm_call_seconds", "LLM latency", buckets=(0.1, 1.0))
+
+    calls.inc(model="flash", status="ok")
+    calls.inc(2, model="flash", status="ok")
+    latency.observe(0.5, model="flash")
+
+    text = registry.render()
+    assert 'llm_calls_total{model="flash",status="ok"} 3.0' in text
+    assert 'llm_call_seconds_bucket{model="flash",le="0.1"} 0' in text
+    assert 'llm_call_seconds_bucket{model="flash",le="1.0"} 1' in text
+    assert 'llm_call_seconds_count{model="flash"} 1' in text
@@ -0,0 +1,41 @@
+# -----------------------------
+# File: tests/test_monitor.py
+# -----------------------------
+"""
+Rolling monitor state in the API: diffs from the screening daemon keep
+the graph analytics incremental, and a daemon restart (new session,
+ticks from 1 again) rebuilds them from the live conjunction set.
+"""
+import asyncio
+
+from app.api import main
+from app.api.state_store import MemoryStore, use_store
+
+
+def _post(session, tick, new=(), cleared=(), live=()):
+    pair = lambda p: {"sat1": p[0], "sat2": p[1], "minDistance": 1.0}
+    diff = {"session": session, "tick": tick, "new": [pair(p) for p in new],
+            "updated": [], "cleared": [pair(p) for p in cleared]}
+    asyncio.run(main.api_monitor_diff({"diff": diff, "conjunctions": [pair(p) for p in live]}))
+
+
+def _edges():
+    return main.graph_summary("monitor", 10)["edges"]
+
+
+def test_daemon_restart_rebuilds_monitor_analytics():
+    with use_store(MemoryStore()):
+        _post("old", 1, new=[("A", "B")], live=[("A", "B")])
+        assert _edges() == 1
+        _post("old", 2, new=[("C", "D")], live=[("A", "B"), ("C", "D")])
+        _post("old", 3, new=[("E", "F")], cleared=[("A", "B")], live=[("C", "D"), ("E", "F")])
+        assert _edges() == 2
+
+        # Restarted daemon: ticks 1 and 2 again, only X-Y is live
+        _post("new", 1, new=[("X", "Y")], live=[("X", "Y")])
+        _post("new", 2, live=[("X", "Y")])
+        assert _edges() == 1
+        assert [d["tick"] for d in main.get_store().get("monitor")["diffs"]] == [1, 2]
+
+        _post("new", 3, new=[("X", "Z")], live=[("X", "Y"), ("X", "Z")])
+        assert _edges() == 2
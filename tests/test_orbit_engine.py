@@ -0,0 +1,185 @@
+# -----------------------------
+# File: tests/test_orbit_engine.py
+# -----------------------------
+"""
+Model A screening tests over the bundled catalogs in app/data/.
+"""
+import datetime
+
+import numpy as np
+import pytest
+from sgp4.api import Satrec
+
+from app.model_a import ephemeris_cache
+from app.model_a.adaptive_sampler import adaptive_min_distances, perigee_accel, state_table
+from app.model_a.debris_cloud import build_clouds, screen_clouds
+from app.model_a.ephemeris_cache import propagate_states, time_grid
+from app.model_a.forecast import (
+    PAIR_WORKSPACE_BYTES,
+    STATE_BYTES,
+    chunk_samples,
+    forecast_conjunctions,
+    pair_timelines,
+)
+from app.model_a.orbit_engine import (
+    DATA_DIR,
+    build_graph_cloud_vs_targets,
+    build_graph_one_vs_many,
+    load_merged_catalog,
+    load_tles_from_file,
+    norad_id,
+    select_tles_by_norad,
+)
+from app.model_a.rolling_screener import RollingScreener
+
+
+def test_select_tles_by_norad():
+    tles = load_tles_from_file(DATA_DIR / "starlink.tle")
+    picked = select_tles_by_norad(tles, [norad_id(tles[0][1]), "0" + norad_id(tles[1][1])])
+    assert [t[0] for t in picked] == [tles[0][0], tles[1][0]]
+
+
+def test_one_vs_many_only_screens_primary_pairs():
+    fleet = load_tles_from_file(DATA_DIR / "starlink.tle")[:5]
+    catalog = load_tles_from_file(DATA_DIR / "active.tle")[:50]
+    G = build_graph_one_vs_many(fleet, catalog, sample_minutes=20, step_min=10, close_threshold_km=1e6)
+
+    primaries = {n for n, d in G.nodes(data=True) if d["primary"]}
+    assert primaries == {t[0] for t in fleet}
+    assert G.number_of_edges() > 0
+    for u, v in G.edges():
+        assert u in primaries or v in primaries
+
+
+def test_rolling_screener_only_propagates_new_slices():
+    tles = load_tles_from_file(DATA_DIR / "starlink.tle")[:30]
+    screener = RollingScreener(tles, horizon_minutes=60, step_min=10, close_threshold_km=1e6)
+    t0 = datetime.datetime(2025, 11, 25)
+
+    first = screener.tick(t0)
+    assert first["propagated_slices"] == 7
+    assert len(first["new"]) == len(screener.conjunctions) > 0
+
+    second = screener.tick(t0 + datetime.timedelta(minutes=10))
+    assert second["propagated_slices"] == 1
+    assert len(screener.slices) == 7
+    assert not second["new"] and not second["cleared"]
+
+
+def test_ephemeris_cache_skips_sgp4_on_repeat(tmp_path, monkeypatch):
+    monkeypatch.setattr(ephemeris_cache, "CACHE_DIR", tmp_path)
+    monkeypatch.setattr(ephemeris_cache, "CACHE_ENABLED", True)
+    ephemeris_cache.clear_memory()
+
+    active = [Satrec.twoline2rv(l1, l2) for _, l1, l2 in load_tles_from_file(DATA_DIR / "active.tle")[:23]]
+    sats, sats_extra = active[:20], active[20:]
+    start = datetime.datetime(2025, 11, 25)
+    propagated = ephemeris_cache.OBJECTS_PROPAGATED
+
+    before = propagated.value()
+    r1, v1 = ephemeris_cache.propagate_cached(sats, start, 10, 13)
+    assert propagated.value() == before + 20
+    assert r1.shape == v1.shape == (20, 13, 3)
+
+    ephemeris_cache.clear_memory()  # force the on-disk path
+    r2, _ = ephemeris_cache.propagate_cached(sats, start, 10, 13)
+    assert propagated.value() == before + 20
+    assert (r1 == r2).all()
+
+    # Other object lists on the same grid reuse the per-object entries
+    r3, _ = ephemeris_cache.propagate_cached(sats[12:2:-1], start, 10, 13)
+    assert propagated.value() == before + 20
+    assert (r3 == r1[12:2:-1]).all()
+    ephemeris_cache.propagate_cached(sats[:5] + sats_extra, start, 10, 13)
+    assert propagated.value() == before + 20 + len(sats_extra)
+
+    # Screening windows start at `now` and cover the whole requested span
+    now = start + datetime.timedelta(minutes=7, seconds=30)
+    r4, _, window_start = ephemeris_cache.propagate_window(sats, 120, 10, now=now)
+    assert now <= window_start < now + datetime.timedelta(minutes=10)
+    assert window_start + datetime.timedelta(minutes=10 * (r4.shape[1] - 1)) >= now + datetime.timedelta(minutes=120)
+
+    ephemeris_cache.evict(max_bytes=0)
+    assert not list(tmp_path.glob("*.npz"))
+
+
+def test_adaptive_sampler_matches_dense_grid_with_fewer_evaluations():
+    tles = load_tles_from_file(DATA_DIR / "starlink.tle")[:60]
+    sats = [Satrec.twoline2rv(l1, l2) for _, l1, l2 in tles]
+    start = datetime.datetime(2025, 11, 25)
+    dense, _ = propagate_states(sats, *time_grid(start, 5 / 60, 361))
+    r, v = propagate_states(sats, *time_grid(start, 0.5, 61))
+
+    I, J = np.triu_indices(len(sats), 1)
+    threshold = 200.0
+    min_d, tca_s, evaluations = adaptive_min_distances(
+        state_table(r, v), perigee_accel(sats), I, J, 30.0, threshold
+    )
+    truth = np.nanmin(np.linalg.norm(dense[I] - dense[J], axis=2), axis=1)
+
+    assert (truth < threshold).any()
+    assert np.all(min_d[truth < threshold] < threshold)
+    assert evaluations < len(I) * r.shape[1] / 2
+
+
+def test_cloud_screen_matches_per_fragment_screen():
+    cloud, _ = load_merged_catalog(["cosmos2251.tle", "iridium33.tle"])
+    targets = load_tles_from_file(DATA_DIR / "starlink.tle")[:40] + load_tles_from_file(DATA_DIR / "active.tle")[:40]
+    kwargs = dict(sample_minutes=60, step_min=10, close_threshold_km=500.0)
+
+    G_cloud = build_graph_cloud_vs_targets(cloud, targets, **kwargs)
+    G_pairs = build_graph_one_vs_many(targets, cloud, **kwargs)
+
+    assert G_pairs.number_of_edges() > 0
+    assert {frozenset(e) for e in G_cloud.edges()} == {frozenset(e) for e in G_pairs.edges()}
+    for u, v, d in G_cloud.edges(data=True):
+        assert abs(d["min_distance_km"] - G_pairs.edges[u, v]["min_distance_km"]) < 1e-6
+    assert any(d["cloud"] for _, d in G_cloud.nodes(data=True))
+
+
+def test_cloud_screen_masks_failed_samples():
+    rng = np.random.default_rng(3)
+    cloud_pos = 7000.0 + rng.normal(scale=50.0, size=(30, 12, 3))
+    target_pos = 7000.0 + rng.normal(scale=50.0, size=(5, 12, 3))
+    cloud_pos[:10, 4:7] = np.nan     # fragments that decayed mid-window
+    cloud_pos[10] = np.nan           # never valid
+    target_pos[0, :3] = np.nan
+
+    clouds = build_clouds(cloud_pos, ["93036"] * 30, max_radius_km=60.0)
+    hits, _ = screen_clouds(clouds, cloud_pos, target_pos, threshold_km=40.0)
+
+    d = np.linalg.norm(cloud_pos[:, None] - target_pos[None], axis=3)
+    truth = np.where(np.isnan(d), np.inf, d).min(axis=2)
+    expected = {(int(f), int(t)) for f, t in zip(*np.nonzero(truth < 40.0))}
+    assert {(f, t) for f, t, _ in hits} == expected
+    assert any(f < 10 for f, _ in expected)
+    for f, t, min_dist in hits:
+        assert abs(min_dist - truth[f, t]) < 1e-9
+
+
+def test_forecast_is_independent_of_memory_chunking():
+    tles, _ = load_merged_catalog(["starlink.tle"])
+    tles = tles[:80]
+    start = datetime.datetime(2025, 11, 25)
+    kwargs = dict(horizon_days=0.5, step_s=30.0, close_threshold_km=100.0, start=start)
+
+    single = forecast_conjunctions(tles, memory_budget_mb=256, **kwargs)
+    small_budget = (PAIR_WORKSPACE_BYTES + 80 * 100 * STATE_BYTES) / 2 ** 20   # ~100 samples
+    chunked = forecast_conjunctions(tles, memory_budget_mb=small_budget, **kwargs)
+
+    assert single["chunks"] == 1 and chunked["chunks"] > 1
+    assert chunk_samples(80, small_budget) == chunked["samples_per_chunk"]
+    assert len(single["events"]) > 0
+    assert [e[:2] for e in single["events"]] == [e[:2] for e in chunked["events"]]
+    assert sum(chunked["per_day"].values()) == len(chunked["events"])
+    assert list(chunked["per_day"]) == ["2025-11-25"]
+
+    timelines = pair_timelines(chunked)
+    assert sum(len(p["encounters"]) for p in timelines) == len(chunked["events"])
+
+
+def test_forecast_rejects_degenerate_steps():
+    tles = load_tles_from_file(DATA_DIR / "starlink.tle")[:5]
+    for kwargs in (dict(step_s=0.0), dict(step_s=0.5), dict(horizon_days=1e-4, step_s=30.0)):
+        with pytest.raises(ValueError):
+            forecast_conjunctions(tles, **{"horizon_days": 1.0, **kwargs})
@@ -0,0 +1,89 @@
+# -----------------------------
+# File: tests/test_report_generator.py
+# -----------------------------
+"""
+Model D: deterministic report sections and the per-snapshot PDF cache.
+The LLM is made unavailable so narrative sections use their fallbacks.
+"""
+import os
+from pathlib import Path
+
+from app.model_d import report_generator
+from app.model_d.prompt_builder import MAX_CHUNKS, build_context, estimate_tokens
+
+RISKS = [
+    {"sat1": "SAT-A", "sat2": "SAT-B", "minDistance": 3.2, "riskScore": 0.9, "maneuver": "Raise SAT-A"},
+    {"sat1": "SAT-A", "sat2": "SAT-C", "minDistance": 8.0, "riskScore": 0.5, "maneuver": "Lower SAT-C"},
+    {"sat1": "SAT-D", "sat2": "SAT-E", "minDistance": 15.0, "riskScore": 0.1, "maneuver": ""},
+]
+
+
+def _no_llm(prompt):
+    raise RuntimeError("LLM disabled in tests")
+
+
+def test_build_report_data_aggregates_without_llm():
+    data = report_generator.build_report_data(RISKS, top_k=2)
+    assert data["num_conjunctions"] == 3
+    assert data["num_objects"] == 5
+    assert data["severity"] == {"high": 1, "medium": 1, "low": 1}
+    assert data["closest_km"] == 3.2
+    assert [c["sat2"] for c in data["top_conjunctions"]] == ["SAT-B", "SAT-C"]
+    assert data["per_object"][0] == {"object": "SAT-A", "conjunctions": 2, "closest_km": 3.2, "max_risk": 0.9}
+
+
+def test_report_is_cached_per_snapshot(tmp_path, monkeypatch):
+    monkeypatch.setattr(report_generator, "REPORT_CACHE_DIR", tmp_path)
+    monkeypatch.setattr(report_generator, "_llm_text", _no_llm)
+
+    first = report_generator.get_or_build_report(RISKS)
+    assert first and first.endswith(".pdf")
+
+    calls = []
+    monkeypatch.setattr(report_generator, "render_report_pdf", lambda *a: calls.append(a))
+    assert report_generator.get_or_build_report(RISKS) == first
+    assert calls == []
+
+    def failing_render(report_data, narratives, out_pdf_path):
+        Path(out_pdf_path).write_bytes(b"partial")
+        raise RuntimeError("render failed")
+
+    monkeypatch.setattr(report_generator, "render_report_pdf", failing_render)
+    assert report_generator.get_or_build_report(RISKS[:1]) is None
+    assert [p.name for p in tmp_path.iterdir()] == [Path(first).name]
+
+
+def test_prompt_context_stays_bounded_as_runs_grow():
+    calls = []
+
+    def fake_llm(prompt):
+        calls.append(prompt)
+        return "Chunk summary."
+
+    sizes = []
+    for n in (10, 1000, 20000):
+        calls.clear()
+        risks = [
+            {"sat1": f"S{i}", "sat2": f"T{i % 37}", "minDistance": (i % 200) / 10.0,
+             "riskScore": (i % 97) / 97.0, "maneuver": "Raise orbit by 0.5 km. " * 10,
+             "proposal": "x" * 2000, "critique": "y" * 2000}
+            for i in range(n)
+        ]
+        context = build_context(risks, llm_fn=fake_llm, token_budget=1500)
+        sizes.append(estimate_tokens(context))
+        assert len(calls) <= MAX_CHUNKS
+        assert "x" * 100 not in context
+
+    assert max(sizes) <= 1500
+    assert "Chunk summary." in context
+
+
+def test_report_cache_evicts_least_recently_used(tmp_path, monkeypatch):
+    monkeypatch.setattr(report_generator, "REPORT_CACHE_DIR", tmp_path)
+    for age, name in enumerate(["c", "b", "a"]):
+        path = tmp_path / f"report_{name}.pdf"
+        path.write_bytes(b"x" * 100)
+        os.utime(path, (1000 - age, 1000 - age))   # a is the oldest
+
+    report_generator.evict_reports(max_bytes=250, keep=tmp_path / "report_a.pdf")
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["report_a.pdf", "report_c.pdf"]
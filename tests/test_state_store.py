@@ -0,0 +1,55 @@
+# -----------------------------
+# File: tests/test_state_store.py
+# -----------------------------
+"""
+Shared API state: two SQLite store handles on one file behave like two
+uvicorn workers (shared values, exclusive compute locks), and the memory
+stand-in has the same semantics.
+"""
+import time
+
+import pytest
+
+from app.api.state_store import MemoryStore, SQLiteStore
+
+
+@pytest.fixture(params=["sqlite", "memory"])
+def workers(request, tmp_path):
+    if request.param == "memory":
+        store = MemoryStore()
+        return store, store
+    path = tmp_path / "state.db"
+    return SQLiteStore(path), SQLiteStore(path)
+
+
+def test_values_are_versioned_and_shared(workers):
+    a, b = workers
+    assert b.get("snapshot:latest") is None and b.version("snapshot:latest") == 0
+
+    a.put("snapshot:latest", "analyze:starlink")
+    a.put("snapshot:latest", "analyze:cosmos")
+    assert b.get("snapshot:latest") == "analyze:cosmos"
+    assert b.version("snapshot:latest") == 2
+
+    for status in ("running", "done"):
+        b.update("job:1", lambda job: {**job, "status": status}, default={"job_id": "1"})
+    assert a.get("job:1") == {"job_id": "1", "status": "done"}
+
+    a.delete("job:1")
+    assert b.get("job:1", "missing") == "missing"
+
+
+def test_compute_lock_is_exclusive_and_expires(workers):
+    a, b = workers
+    assert a.acquire("compute:k", "worker-a", ttl_s=60)
+    assert not b.acquire("compute:k", "worker-b", ttl_s=60)
+    assert b.locked("compute:k")
+
+    b.release("compute:k", "worker-b")   # not the owner: no effect
+    assert a.locked("compute:k")
+    a.release("compute:k", "worker-a")
+    assert not b.locked("compute:k")
+
+    assert a.acquire("compute:k", "worker-a", ttl_s=0.05)
+    time.sleep(0.1)
+    assert b.acquire("compute:k", "worker-b", ttl_s=60)
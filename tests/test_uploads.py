@@ -0,0 +1,56 @@
+# -----------------------------
+# File: tests/test_uploads.py
+# -----------------------------
+"""
+Upload lifecycle: oversized and fully invalid uploads are rejected
+without leaving a catalog file, and a job's catalog file is deleted
+together with its expired job record.
+"""
+import asyncio
+import io
+import os
+import time
+
+from starlette.datastructures import UploadFile
+
+from app.api import main
+from app.api.state_store import MemoryStore, use_store
+
+with open(os.path.join(main.DATA_DIR, "starlink.tle"), encoding="utf-8") as f:
+    STARLINK = f.read()
+
+
+def _upload(text: str):
+    return asyncio.run(main.api_upload(UploadFile(io.BytesIO(text.encode("utf-8")), filename="c.tle")))
+
+
+def _uploads(tmp_path):
+    return sorted(os.listdir(tmp_path / main.UPLOAD_SUBDIR))
+
+
+def test_rejected_uploads_leave_no_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(main, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(main, "UPLOAD_MAX_BYTES", 4096)
+    monkeypatch.setattr(main, "UPLOAD_CHUNK_BYTES", 1024)
+
+    assert _upload("not a tle\n" * 10)["status"] == "rejected"
+    oversized = _upload(STARLINK)
+    assert oversized["status"] == "rejected" and "exceeds" in oversized["error"]
+    assert _uploads(tmp_path) == []
+
+
+def test_expired_jobs_remove_their_catalog_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(main, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(main, "JOB_RETENTION_S", 60.0)
+    os.makedirs(tmp_path / main.UPLOAD_SUBDIR)
+    with use_store(MemoryStore()) as store:
+        for job_id in ("old", "new"):
+            with open(main.upload_path(job_id), "w", encoding="utf-8") as f:
+                f.write(STARLINK)
+        main.create_job("old", {"status": "done"})
+        later = time.time() + 120.0
+        monkeypatch.setattr(main.time, "time", lambda: later)
+        main.create_job("new", {"status": "queued"})
+
+        assert store.get("job:old") is None
+        assert _uploads(tmp_path) == ["new.tle"]